@@ -1,7 +1,9 @@
 import os
+from datetime import date
 from pathlib import Path
 import logging
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 
 # ========== Configurações Básicas ==========
 logger = logging.getLogger(__name__)
@@ -85,16 +87,25 @@ TAILWIND_APP_NAME = 'theme'
 
 
 # ========== Configurações de Banco de Dados ==========
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.getenv('CONTAINER_NAME', 'azure_devops_db'),
-        'USER': os.getenv('DB_USER', 'myuser'),
-        'PASSWORD': os.getenv('DB_PASSWORD', 'mypassword'),
-        'HOST': os.getenv('DB_HOST', 'db'),
-        'PORT': os.getenv('DB_PORT', '5432'),
+# DB_ENGINE=sqlite3 usa um arquivo local (testes e desenvolvimento sem o container do banco)
+if os.getenv('DB_ENGINE', 'postgresql') == 'sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('CONTAINER_NAME', 'azure_devops_db'),
+            'USER': os.getenv('DB_USER', 'myuser'),
+            'PASSWORD': os.getenv('DB_PASSWORD', 'mypassword'),
+            'HOST': os.getenv('DB_HOST', 'db'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+        }
     }
-}
 
 
 # ========== Configurações de Segurança ==========
@@ -114,3 +125,23 @@ USE_TZ = True
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+
+# ========== Calendário de Dias Úteis (lead time) ==========
+# Feriados da empresa (AAAA-MM-DD, separados por vírgula), além dos nacionais
+COMPANY_HOLIDAYS = [d.strip() for d in os.getenv('COMPANY_HOLIDAYS', '').split(',') if d.strip()]
+# Validado aqui, na inicialização, e não só no primeiro cálculo de lead time
+for _holiday in COMPANY_HOLIDAYS:
+    try:
+        date.fromisoformat(_holiday)
+    except ValueError:
+        raise ImproperlyConfigured(f"COMPANY_HOLIDAYS: data inválida '{_holiday}' (use AAAA-MM-DD).")
+# Inclui Carnaval (segunda e terça) e Corpus Christi, pontos facultativos nacionais
+BUSINESS_CALENDAR_OPTIONAL_HOLIDAYS = os.getenv('BUSINESS_CALENDAR_OPTIONAL_HOLIDAYS', 'True') == 'True'
+# Intervalo de anos do índice pré-calculado; datas fora dele usam numpy.busday_count
+BUSINESS_CALENDAR_START_YEAR = int(os.getenv('BUSINESS_CALENDAR_START_YEAR', 2015))
+BUSINESS_CALENDAR_END_YEAR = int(os.getenv('BUSINESS_CALENDAR_END_YEAR', 2035))
+
+# ========== Agregados do Dashboard ==========
+# No PostgreSQL, DeliveryProgress e BacklogSummary são lidos de materialized views
+# atualizadas ao fim do ETL; nos demais bancos, das tabelas populadas pelos comandos
+SUMMARY_MATERIALIZED_VIEWS = os.getenv('SUMMARY_MATERIALIZED_VIEWS', 'True') == 'True'
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import WorkItemHistory, KPI, DeliveryProgress, BacklogSummary
+from .models import WorkItemHistory, KPI, DeliveryProgress, BacklogSummary, DeliveryProgressView, BacklogSummaryView
+from .utils.materialized_views import materialized_views_enabled
 
 # Admin para WorkItem
 class WorkItemAdmin(admin.ModelAdmin):
@@ -28,7 +29,6 @@ class KPIAdmin(admin.ModelAdmin):
     readonly_fields = ('calculated_date',)
 
 # Admin para DeliveryProgress
-@admin.register(DeliveryProgress)
 class DeliveryProgressAdmin(admin.ModelAdmin):
     list_display = ('month', 'type', 'total_items', 'closed_items')
     list_filter = ('month', 'type')
@@ -36,9 +36,34 @@ class DeliveryProgressAdmin(admin.ModelAdmin):
     ordering = ('-month',)
 
 # Admin para BacklogSummary
-@admin.register(BacklogSummary)
 class BacklogSummaryAdmin(admin.ModelAdmin):
     list_display = ('type', 'month', 'year', 'backlog_count')
     list_filter = ('type', 'month', 'year')
     search_fields = ('type',)
     ordering = ('-year', '-month')
+
+
+# Admin somente leitura para as materialized views (PostgreSQL)
+class ReadOnlyViewAdmin(admin.ModelAdmin):
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+class DeliveryProgressViewAdmin(ReadOnlyViewAdmin, DeliveryProgressAdmin):
+    pass
+
+class BacklogSummaryViewAdmin(ReadOnlyViewAdmin, BacklogSummaryAdmin):
+    pass
+
+# Uma página por agregado: com as views em uso, as tabelas não têm leitores
+if materialized_views_enabled():
+    admin.site.register(DeliveryProgressView, DeliveryProgressViewAdmin)
+    admin.site.register(BacklogSummaryView, BacklogSummaryViewAdmin)
+else:
+    admin.site.register(DeliveryProgress, DeliveryProgressAdmin)
+    admin.site.register(BacklogSummary, BacklogSummaryAdmin)
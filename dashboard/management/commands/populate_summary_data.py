@@ -1,8 +1,10 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.db.models import Count, Q, F
 from django.db.models.functions import TruncMonth
 from datetime import datetime
 from ...models import WorkItem, DeliveryProgress, BacklogSummary
+from ...utils.materialized_views import refresh_materialized_views
 
 
 class Command(BaseCommand):
@@ -11,21 +13,28 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         self.stdout.write(self.style.SUCCESS('Iniciando a carga de dados agregados...'))
 
-        # Limpar dados antigos
-        self.stdout.write('Limpando dados antigos...')
-        DeliveryProgress.objects.all().delete()
-        self.stdout.write('Dados antigos da tabela DeliveryProgress limpos.')
+        # No PostgreSQL os dashboards leem as materialized views, recalculadas no servidor
+        if refresh_materialized_views():
+            self.stdout.write(self.style.SUCCESS('Materialized views de DeliveryProgress e BacklogSummary atualizadas!'))
+            return
 
-        BacklogSummary.objects.all().delete()
-        self.stdout.write('Dados antigos da tabela BacklogSummary limpos.')
+        # Limpeza e recarga na mesma transação: os leitores não veem as tabelas pela metade
+        with transaction.atomic():
+            # Limpar dados antigos
+            self.stdout.write('Limpando dados antigos...')
+            DeliveryProgress.objects.all().delete()
+            self.stdout.write('Dados antigos da tabela DeliveryProgress limpos.')
 
-        # Populando DeliveryProgress
-        self.stdout.write('Populando DeliveryProgress...')
-        self._populate_delivery_progress()
+            BacklogSummary.objects.all().delete()
+            self.stdout.write('Dados antigos da tabela BacklogSummary limpos.')
 
-        # Populando BacklogSummary
-        self.stdout.write('Populando BacklogSummary...')
-        self._populate_backlog_summary()
+            # Populando DeliveryProgress
+            self.stdout.write('Populando DeliveryProgress...')
+            self._populate_delivery_progress()
+
+            # Populando BacklogSummary
+            self.stdout.write('Populando BacklogSummary...')
+            self._populate_backlog_summary()
 
     def _populate_delivery_progress(self):
         """Popula a tabela DeliveryProgress com base nos WorkItems"""
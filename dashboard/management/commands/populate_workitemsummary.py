@@ -1,66 +1,72 @@
 from django.core.management.base import BaseCommand
-from django.db.models import Count, Avg, F, Q
+from django.db.models import Max
 from django.utils.timezone import now
 from dashboard.models import WorkItem, WorkItemSummary
+from dashboard.utils.summaries import aggregate_summaries, bucket_filter, write_summaries
 from datetime import date
 
+
+def changed_buckets(since):
+    """
+    Buckets (tipo, ano, mês de resolução) com Work Items gravados a partir de `since`.
+    Só vê o bucket atual de cada item: o bucket que um item deixa (troca de tipo ou
+    resolução desfeita) é recalculado no próprio save (ver remember_previous_bucket em
+    dashboard/signals.py) ou ao fim de bulk_ingest.
+    """
+    return set(
+        WorkItem.objects.filter(updated_at__gte=since, resolved_date__isnull=False)
+        .values_list('type', 'resolved_date__year', 'resolved_date__month')
+        .distinct()
+    )
+
+
 class Command(BaseCommand):
     help = 'Atualiza os resumos de WorkItems para refletir os dados mais recentes.'
 
-    def handle(self, *args, **options):
-        self.stdout.write("Iniciando a limpeza e carga dos dados de WorkItemSummary...")
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Recalcula apenas os buckets (tipo, mês) com Work Items alterados desde o último refresh.',
+        )
 
-        # Passo 1: Limpeza dos resumos existentes
-        self.stdout.write("Limpando dados antigos na WorkItemSummary...")
-        WorkItemSummary.objects.all().delete()
-        self.stdout.write("Dados antigos limpos com sucesso!")
+    def handle(self, *args, **options):
+        # Marcado antes das consultas: o que mudar durante a execução entra no próximo refresh
+        started = now()
+        if options['incremental']:
+            last_refresh = WorkItemSummary.objects.aggregate(last=Max('refreshed_at'))['last']
+            if last_refresh is None:
+                self.stdout.write("Nenhum refresh anterior encontrado; executando a carga completa.")
+            else:
+                self.refresh_incremental(last_refresh, started)
+                return
+        self.refresh_full(started)
 
-        # Passo 2: Cálculo dos novos dados agregados
-        self.stdout.write("Calculando dados agregados...")
+    def refresh_full(self, started):
+        self.stdout.write("Iniciando a carga completa dos dados de WorkItemSummary...")
 
         # Filtro para obter apenas itens resolvidos
         work_items = WorkItem.objects.filter(archived=False, resolved_date__isnull=False)
-        
-        # Agregando dados por tipo de WorkItem e por mês (usando a data de resolução)
-        summaries = work_items.annotate(
-            year=F('resolved_date__year'),
-            month=F('resolved_date__month')
-        ).values('type', 'year', 'month').annotate(
-            total_count=Count('id'),
-            closed_count=Count('id', filter=Q(state='Resolved')),
-            average_lead_time=Avg('lead_time', filter=Q(state='Resolved')),
-        )
 
-        # Passo 3: Inserção ou atualização dos dados agregados na tabela WorkItemSummary
-        for summary in summaries:
-            year = summary['year']
-            month = summary['month']
-            work_type = summary['type']
+        self.stdout.write("Calculando dados agregados...")
+        summaries = aggregate_summaries(work_items, started)
+
+        # Upsert e limpeza dos buckets antigos na mesma transação: os dashboards não veem a tabela vazia
+        removed = write_summaries(summaries, WorkItemSummary.objects.all(), started)
+        self.stdout.write(f"{len(summaries)} resumos carregados e {removed} antigos removidos com sucesso!")
 
-            # Calcular a porcentagem de itens fechados
-            closed_percentage = (summary['closed_count'] / summary['total_count']) * 100 if summary['total_count'] > 0 else 0.0
+    def refresh_incremental(self, last_refresh, started):
+        self.stdout.write(f"Buscando Work Items alterados desde {last_refresh:%Y-%m-%d %H:%M:%S}...")
+        buckets = changed_buckets(last_refresh)
+        if not buckets:
+            self.stdout.write("Nenhum bucket alterado; resumos já estão atualizados.")
+            return
 
-            # Calcular a porcentagem de rework (reabertos e resolvidos novamente)
-            rework_count = WorkItem.objects.filter(
-                type=work_type,
-                state='Resolved',
-                resolved_date__year=year,
-                resolved_date__month=month,
-                archived=False
-            ).filter(Q(state='Reopened')).count()
-            rework_percentage = (rework_count / summary['total_count']) * 100 if summary['total_count'] > 0 else 0.0
+        work_items = WorkItem.objects.filter(bucket_filter(buckets), archived=False, resolved_date__isnull=False)
 
-            # Criar ou atualizar os resumos
-            WorkItemSummary.objects.update_or_create(
-                type=work_type,
-                year=year,
-                month=month,
-                defaults={
-                    'total_count': summary['total_count'],
-                    'average_lead_time': summary['average_lead_time'] or 0.0,
-                    'closed_percentage': closed_percentage,
-                    'rework_percentage': rework_percentage
-                }
-            )
+        self.stdout.write(f"Recalculando {len(buckets)} buckets (tipo, mês)...")
+        summaries = aggregate_summaries(work_items, started)
 
-        self.stdout.write("Dados agregados carregados com sucesso!")
+        # Buckets que ficaram sem itens (ex.: todos arquivados) saem do resumo
+        stale = WorkItemSummary.objects.filter(bucket_filter(buckets, 'year', 'month'))
+        removed = write_summaries(summaries, stale, started)
+        self.stdout.write(f"{len(summaries)} resumos atualizados e {removed} removidos.")
@@ -1,11 +1,16 @@
 from django.core.management.base import BaseCommand
 
-from dashboard.utils import update_lead_times
+from dashboard.utils.lead_time import update_lead_times
+from dashboard.models import WorkItem
 
 class Command(BaseCommand):
     help = 'Atualiza os valores de lead_time para WorkItems existentes'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recalcula também os lead times já preenchidos.')
+
     def handle(self, *args, **kwargs):
         self.stdout.write("Iniciando atualização de lead time...")
-        update_lead_times()
+        updated = update_lead_times(WorkItem.objects.all(), only_missing=not kwargs['all'])
+        self.stdout.write(f"{updated} registros atualizados com lead time.")
         self.stdout.write("Atualização concluída!")
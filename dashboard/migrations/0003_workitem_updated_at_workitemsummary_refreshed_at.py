@@ -0,0 +1,23 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_workitem_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workitem',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='workitemsummary',
+            name='refreshed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.1.4 on 2026-10-17 16:14
+
+from django.db import migrations, models
+
+# Mesmas regras de populate_summary_data: Work Items resolvidos, não arquivados e
+# criados no ano corrente (avaliado a cada REFRESH)
+CURRENT_YEAR_ITEMS = """
+    SELECT type, created_date, resolved_date
+    FROM dashboard_workitem
+    WHERE NOT archived
+      AND resolved_date IS NOT NULL
+      AND created_date >= date_trunc('year', current_date)
+      AND created_date < date_trunc('year', current_date) + interval '1 year'
+"""
+
+CREATE_VIEWS = [
+    f"""
+    CREATE MATERIALIZED VIEW dashboard_deliveryprogress_mv AS
+    SELECT
+        row_number() OVER (ORDER BY month, type) AS id,
+        month,
+        EXTRACT(YEAR FROM month)::integer AS year,
+        type,
+        COUNT(*) FILTER (WHERE date_trunc('month', created_date) = month)::integer AS total_items,
+        COUNT(*)::integer AS closed_items
+    FROM (
+        SELECT type, created_date, date_trunc('month', resolved_date)::date AS month
+        FROM ({CURRENT_YEAR_ITEMS}) items
+    ) resolved
+    GROUP BY month, type
+    """,
+    # REFRESH ... CONCURRENTLY exige um índice único sem expressões nem WHERE
+    "CREATE UNIQUE INDEX dashboard_deliveryprogress_mv_uniq ON dashboard_deliveryprogress_mv (month, type)",
+    f"""
+    CREATE MATERIALIZED VIEW dashboard_backlogsummary_mv AS
+    SELECT
+        row_number() OVER (ORDER BY month, type) AS id,
+        type,
+        COUNT(*)::integer AS backlog_count,
+        month,
+        EXTRACT(YEAR FROM month)::integer AS year
+    FROM (
+        SELECT type, date_trunc('month', created_date)::date AS month
+        FROM ({CURRENT_YEAR_ITEMS}) items
+    ) created
+    GROUP BY month, type
+    """,
+    "CREATE UNIQUE INDEX dashboard_backlogsummary_mv_uniq ON dashboard_backlogsummary_mv (type, year, month)",
+]
+
+DROP_VIEWS = [
+    "DROP MATERIALIZED VIEW IF EXISTS dashboard_backlogsummary_mv",
+    "DROP MATERIALIZED VIEW IF EXISTS dashboard_deliveryprogress_mv",
+]
+
+
+def create_materialized_views(apps, schema_editor):
+    # Nos demais bancos os dashboards continuam lendo as tabelas DeliveryProgress e BacklogSummary
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in CREATE_VIEWS:
+        schema_editor.execute(sql)
+
+
+def drop_materialized_views(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in DROP_VIEWS:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_workitem_updated_at_workitemsummary_refreshed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BacklogSummaryView',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('UserStory', 'User Story'), ('Incident', 'Incident'), ('Bug', 'Bug'), ('Task', 'Task')], max_length=50)),
+                ('backlog_count', models.IntegerField()),
+                ('month', models.DateField()),
+                ('year', models.IntegerField()),
+            ],
+            options={
+                'verbose_name': 'Backlog Summary (view)',
+                'verbose_name_plural': 'Backlog Summaries (view)',
+                'db_table': 'dashboard_backlogsummary_mv',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='DeliveryProgressView',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('month', models.DateField()),
+                ('year', models.IntegerField()),
+                ('type', models.CharField(choices=[('Task', 'Task'), ('Bug', 'Bug'), ('UserStory', 'User Story'), ('Incident', 'Incident')], max_length=50, null=True)),
+                ('total_items', models.IntegerField()),
+                ('closed_items', models.IntegerField()),
+            ],
+            options={
+                'verbose_name': 'Delivery Progress (view)',
+                'verbose_name_plural': 'Delivery Progresses (view)',
+                'db_table': 'dashboard_deliveryprogress_mv',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_materialized_views, drop_materialized_views),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.1.4 on 2026-10-17 18:02
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# Consulta e SQL anteriores (row_number()), para a reversão
+previous = import_module('dashboard.migrations.0004_summary_materialized_views')
+
+# A chave AAAAMM-tipo vem do par único (month, type): ao contrário de row_number(), não
+# muda a cada REFRESH quando um bucket aparece ou some
+STABLE_ID = "concat(to_char(month, 'YYYYMM'), '-', type)"
+
+CREATE_VIEWS = [
+    f"""
+    CREATE MATERIALIZED VIEW dashboard_deliveryprogress_mv AS
+    SELECT
+        {STABLE_ID} AS id,
+        month,
+        EXTRACT(YEAR FROM month)::integer AS year,
+        type,
+        COUNT(*) FILTER (WHERE date_trunc('month', created_date) = month)::integer AS total_items,
+        COUNT(*)::integer AS closed_items
+    FROM (
+        SELECT type, created_date, date_trunc('month', resolved_date)::date AS month
+        FROM ({previous.CURRENT_YEAR_ITEMS}) items
+    ) resolved
+    GROUP BY month, type
+    """,
+    "CREATE UNIQUE INDEX dashboard_deliveryprogress_mv_uniq ON dashboard_deliveryprogress_mv (month, type)",
+    f"""
+    CREATE MATERIALIZED VIEW dashboard_backlogsummary_mv AS
+    SELECT
+        {STABLE_ID} AS id,
+        type,
+        COUNT(*)::integer AS backlog_count,
+        month,
+        EXTRACT(YEAR FROM month)::integer AS year
+    FROM (
+        SELECT type, date_trunc('month', created_date)::date AS month
+        FROM ({previous.CURRENT_YEAR_ITEMS}) items
+    ) created
+    GROUP BY month, type
+    """,
+    "CREATE UNIQUE INDEX dashboard_backlogsummary_mv_uniq ON dashboard_backlogsummary_mv (type, year, month)",
+]
+
+
+def recreate_views(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in previous.DROP_VIEWS + statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_summary_materialized_views'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='backlogsummaryview',
+            name='id',
+            field=models.CharField(max_length=64, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='deliveryprogressview',
+            name='id',
+            field=models.CharField(max_length=64, primary_key=True, serialize=False),
+        ),
+        migrations.RunPython(recreate_views(CREATE_VIEWS), recreate_views(previous.CREATE_VIEWS)),
+    ]
@@ -21,6 +21,10 @@ class WorkItem(models.Model):
     lead_time = models.IntegerField(null=True, blank=True)
     archived = models.BooleanField(default=False)
     assigned_to = models.CharField(max_length=255, null=True, blank=True)
+    # Hash dos campos extraídos; o ETL só regrava o item quando ele muda
+    content_hash = models.BigIntegerField(null=True, blank=True, editable=False)
+    # Última gravação do item; usado no refresh incremental do WorkItemSummary
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         indexes = [
@@ -66,6 +70,8 @@ class WorkItemSummary(models.Model):
     rework_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0.0)
     month = models.IntegerField()  
     year = models.IntegerField()  
+    # Início do último populate_workitemsummary que recalculou o bucket
+    refreshed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ('type', 'year', 'month')
@@ -126,6 +132,45 @@ class BacklogSummary(models.Model):
         return f"Backlog for {self.type} ({self.month}-{self.year})"
 
 
+# Versões somente leitura de DeliveryProgress e BacklogSummary, sobre as materialized
+# views criadas pela migração 0004 no PostgreSQL (ver dashboard/utils/materialized_views.py)
+class DeliveryProgressView(models.Model):
+    # AAAAMM-tipo: estável entre REFRESHs (ver migração 0005)
+    id = models.CharField(max_length=64, primary_key=True)
+    month = models.DateField()
+    year = models.IntegerField()
+    type = models.CharField(max_length=50, null=True, choices=WorkItem.WORK_ITEM_TYPES)
+    total_items = models.IntegerField()
+    closed_items = models.IntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'dashboard_deliveryprogress_mv'
+        verbose_name = "Delivery Progress (view)"
+        verbose_name_plural = "Delivery Progresses (view)"
+
+    def __str__(self):
+        return f"Delivery Progress ({self.month}-{self.year}, {self.type})"
+
+
+class BacklogSummaryView(models.Model):
+    # AAAAMM-tipo: estável entre REFRESHs (ver migração 0005)
+    id = models.CharField(max_length=64, primary_key=True)
+    type = models.CharField(max_length=50, choices=BacklogSummary.WORK_ITEM_TYPES)
+    backlog_count = models.IntegerField()
+    month = models.DateField()
+    year = models.IntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'dashboard_backlogsummary_mv'
+        verbose_name = "Backlog Summary (view)"
+        verbose_name_plural = "Backlog Summaries (view)"
+
+    def __str__(self):
+        return f"Backlog for {self.type} ({self.month}-{self.year})"
+
+
 class KPI(models.Model):
     METRIC_TYPES = [
         ("percentage", "Percentage"),
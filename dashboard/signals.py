@@ -1,11 +1,14 @@
-import calendar
-from datetime import date, timedelta
-from django.db.models import Count, Q
+import logging
+import threading
+from contextlib import contextmanager
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
 from .models import WorkItem, WorkItemHistory, WorkItemSummary, DeliveryProgress
+from .utils.lead_time import business_days_between, update_lead_times
+from .utils.materialized_views import materialized_views_enabled
+from .utils.summaries import SUMMARY_FIELDS, aggregate_buckets, bucket_filter, build_summary
 
 
 @receiver(pre_save, sender=WorkItem)
@@ -13,6 +16,9 @@ def track_state_change(sender, instance, **kwargs):
     """
     Verifica se houve alteração no estado do WorkItem para atualizar WorkItemHistory.
     """
+    if in_bulk_ingest():
+        # Na carga em lote o histórico é gravado pelo próprio carregador
+        return
     if instance.pk:
         try:
             previous = WorkItem.objects.get(pk=instance.pk)
@@ -26,18 +32,38 @@ def track_state_change(sender, instance, **kwargs):
             pass
 
 
+@receiver(pre_save, sender=WorkItem)
+def remember_previous_bucket(sender, instance, **kwargs):
+    """
+    Guarda o bucket (tipo, mês de resolução) em que o WorkItem estava contado, quando o
+    save o tira dele (troca de tipo, de mês ou resolução desfeita), para que o post_save
+    recalcule também o bucket antigo.
+    """
+    instance._previous_bucket = None
+    if not instance.pk:
+        return
+    previous = WorkItem.objects.filter(pk=instance.pk).values_list('type', 'resolved_date').first()
+    if previous is None or previous[1] is None:
+        return
+    bucket = (previous[0], previous[1].replace(day=1))
+    current = (instance.type, instance.resolved_date.replace(day=1)) if instance.resolved_date else None
+    if bucket != current:
+        instance._previous_bucket = bucket
+
+
 @receiver(post_save, sender=WorkItem)
 def calculate_lead_time(sender, instance, created, **kwargs):
     """
     Calcula o lead_time para um WorkItem resolvido, se ainda não calculado.
     """
     if instance.resolved_date and not instance.lead_time:
-        created_date = instance.created_date
-        resolved_date = instance.resolved_date
-        if created_date and resolved_date and created_date <= resolved_date:
-            lead_time = sum(1 for day in range((resolved_date - created_date).days + 1)
-                            if (created_date + timedelta(days=day)).weekday() < 5)  # Exclui fins de semana
-            WorkItem.objects.filter(pk=instance.pk).update(lead_time=lead_time)
+        if in_bulk_ingest():
+            # Calculado para todo o bucket ao fim da carga
+            mark_dirty(instance.type, instance.resolved_date)
+            return
+        lead_time = business_days_between(instance.created_date, instance.resolved_date)
+        if lead_time is not None:
+            WorkItem.objects.filter(pk=instance.pk).update(lead_time=lead_time, updated_at=timezone.now())
 
 
 @receiver(post_save, sender=WorkItem)
@@ -45,51 +71,136 @@ def update_workitemsummary_and_deliveryprogress(sender, instance, created, **kwa
     """
     Atualiza ou cria entradas em WorkItemSummary e DeliveryProgress com base no WorkItem salvo.
     """
+    # Bucket que o item deixou neste save (ver remember_previous_bucket)
+    previous = getattr(instance, '_previous_bucket', None)
+    if previous:
+        if in_bulk_ingest():
+            mark_dirty(*previous)
+        else:
+            _refresh_bucket(*previous)
+
     # Determinar o mês de resolução (para agregação)
     if instance.resolved_date:
-        resolved_month = instance.resolved_date.replace(day=1)  # Definindo o mês para agregação
+        if in_bulk_ingest():
+            mark_dirty(instance.type, instance.resolved_date)
+            return
+        _refresh_bucket(instance.type, instance.resolved_date.replace(day=1))
 
-        # Atualizar ou criar o resumo na tabela WorkItemSummary
-        summary, created = WorkItemSummary.objects.get_or_create(
-            type=instance.type,
-            created_date=resolved_month
-        )
-        
-        # Atualizar o total de WorkItems por tipo
-        summary.total_count = WorkItem.objects.filter(type=instance.type, resolved_date__month=resolved_month.month).count()
-        summary.active_count = WorkItem.objects.filter(type=instance.type, state='Active', resolved_date__month=resolved_month.month).count()
-        summary.closed_count = WorkItem.objects.filter(type=instance.type, state='Closed', resolved_date__month=resolved_month.month).count()
-        
-        # Recalcular o percentual de fechamento (closed_percentage)
-        total_items = summary.total_count
-        closed_items = summary.closed_count
-        if total_items > 0:
-            summary.closed_percentage = (closed_items / total_items) * 100
-        else:
-            summary.closed_percentage = 0
-        
-        # Salvar o resumo
-        summary.save()
-
-        # Atualizar a tabela DeliveryProgress
-        # Cria ou atualiza a entrada de DeliveryProgress para o mês
-        delivery_progress, created = DeliveryProgress.objects.get_or_create(
-            month=resolved_month,
-            type=instance.type
+
+def _refresh_bucket(work_item_type, resolved_month):
+    """
+    Recalcula WorkItemSummary e DeliveryProgress de um tipo em um mês de resolução,
+    com a mesma agregação de populate_workitemsummary.
+    """
+    bucket = (work_item_type, resolved_month.year, resolved_month.month)
+    buckets = list(aggregate_buckets(
+        WorkItem.objects.filter(bucket_filter([bucket]), archived=False, resolved_date__isnull=False)
+    ))
+    if buckets:
+        # refreshed_at fica com o populate_workitemsummary (base do refresh incremental)
+        summary = build_summary(buckets[0], refreshed_at=None)
+        WorkItemSummary.objects.update_or_create(
+            type=work_item_type,
+            year=resolved_month.year,
+            month=resolved_month.month,
+            defaults={field: getattr(summary, field) for field in SUMMARY_FIELDS if field != 'refreshed_at'},
         )
+        total_items, closed_items = buckets[0]['total_count'], buckets[0]['closed_count']
+    else:
+        # Bucket sem itens resolvidos: sai do resumo, como no refresh completo
+        WorkItemSummary.objects.filter(bucket_filter([bucket], 'year', 'month')).delete()
+        total_items = closed_items = 0
+
+    # Com as materialized views em uso, a tabela DeliveryProgress não tem leitores
+    if materialized_views_enabled():
+        return
+
+    # Atualizar a tabela DeliveryProgress
+    DeliveryProgress.objects.update_or_create(
+        month=resolved_month,
+        year=resolved_month.year,
+        type=work_item_type,
+        defaults={
+            'total_items': total_items,
+            'closed_items': closed_items,
+        },
+    )
+
+
+# Estado da carga em lote, por thread (ver bulk_ingest)
+_bulk = threading.local()
+
 
-        # Atualizar progresso
-        delivery_progress.total_items = WorkItem.objects.filter(
-            type=instance.type,
-            resolved_date__month=resolved_month.month
-        ).count()
+def in_bulk_ingest():
+    return getattr(_bulk, 'depth', 0) > 0
 
-        delivery_progress.closed_items = WorkItem.objects.filter(
-            type=instance.type,
-            state='Closed',
-            resolved_date__month=resolved_month.month
-        ).count()
 
-        # Salvar a entrega progressiva
-        delivery_progress.save()
+def mark_dirty(work_item_type, resolved_date):
+    """
+    Registra o bucket (tipo, mês de resolução) para recálculo ao fim de bulk_ingest.
+    Fora de bulk_ingest não faz nada.
+    """
+    if in_bulk_ingest() and work_item_type and resolved_date:
+        _bulk.dirty.add((work_item_type, resolved_date.replace(day=1)))
+
 
+def dirty_buckets():
+    """
+    Buckets registrados até agora no bulk_ingest corrente (cópia), para que uma carga
+    retomável os guarde junto do seu progresso.
+    """
+    return set(_bulk.dirty) if in_bulk_ingest() else set()
+
+
+@contextmanager
+def bulk_ingest():
+    """
+    Suspende os handlers por linha do WorkItem durante cargas em lote (ETL, comandos):
+    os saves apenas registram os buckets (tipo, mês) afetados, recalculados uma única
+    vez na saída. Saves fora do bloco (ex.: admin) mantêm o comportamento por linha.
+    Pode ser aninhado; o recálculo acontece ao sair do bloco mais externo, também quando
+    a carga termina com erro: blocos e arquivos já confirmados precisam dos resumos
+    atualizados, e recalcular um bucket cuja transação foi desfeita não muda nada.
+    """
+    if not in_bulk_ingest():
+        _bulk.dirty = set()
+    _bulk.depth = getattr(_bulk, 'depth', 0) + 1
+    try:
+        yield
+    except BaseException:
+        dirty = _leave_bulk_ingest()
+        if dirty:
+            try:
+                refresh_buckets(dirty)
+            except Exception as e:
+                # O erro original da carga é o que sobe
+                logging.error(f"Erro ao recalcular os resumos após a falha da carga: {e}")
+        raise
+    refresh_buckets(_leave_bulk_ingest())
+
+
+def _leave_bulk_ingest():
+    """
+    Sai de um nível de bulk_ingest; no mais externo, retorna (e limpa) os buckets registrados.
+    """
+    _bulk.depth -= 1
+    if _bulk.depth > 0:
+        return set()
+    dirty, _bulk.dirty = _bulk.dirty, set()
+    return dirty
+
+
+def refresh_buckets(buckets):
+    """
+    Recalcula lead times pendentes e os resumos dos buckets (tipo, mês) informados.
+    """
+    if not buckets:
+        return
+    for work_item_type, resolved_month in sorted(buckets):
+        update_lead_times(WorkItem.objects.filter(
+            type=work_item_type,
+            resolved_date__year=resolved_month.year,
+            resolved_date__month=resolved_month.month,
+        ))
+        _refresh_bucket(work_item_type, resolved_month)
+    logging.info(f"{len(buckets)} buckets (tipo, mês) de resumo recalculados.")
@@ -0,0 +1,47 @@
+from datetime import date
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from dashboard.utils.business_calendar import (
+    brazilian_holidays, build_calendar, calendar_holidays, easter,
+)
+from dashboard.utils.lead_time import business_days_between
+
+
+class BusinessCalendarTests(SimpleTestCase):
+    def test_easter(self):
+        self.assertEqual(easter(2024), date(2024, 3, 31))
+        self.assertEqual(easter(2025), date(2025, 4, 20))
+
+    def test_national_holidays(self):
+        holidays = brazilian_holidays(2024)
+        self.assertIn(date(2024, 3, 29), holidays)  # Sexta-feira Santa
+        self.assertIn(date(2024, 2, 12), holidays)  # Segunda de Carnaval
+        self.assertIn(date(2024, 11, 20), holidays)
+        self.assertNotIn(date(2023, 11, 20), brazilian_holidays(2023))
+        self.assertNotIn(date(2024, 2, 12), brazilian_holidays(2024, optional=False))
+
+    def test_holidays_are_not_business_days(self):
+        calendar = build_calendar(2024, 2024)
+        # Segunda a sexta da semana do Natal
+        self.assertEqual(calendar.count([np.datetime64("2024-12-23")], [np.datetime64("2024-12-27")])[0], 4)
+
+    def test_dates_outside_index_use_the_same_holidays(self):
+        calendar = build_calendar(2024, 2024)
+        start = np.array(["2025-01-01", "2025-04-14"], dtype="datetime64[D]")
+        end = np.array(["2025-12-31", "2025-04-25"], dtype="datetime64[D]")
+
+        expected = np.busday_count(start, end + np.timedelta64(1, "D"),
+                                   holidays=np.array(calendar_holidays(2025, 2025), dtype="datetime64[D]"))
+        np.testing.assert_array_equal(calendar.count(start, end), expected)
+        # Sexta-feira Santa (18/04) e Tiradentes (21/04) na janela de abril
+        self.assertEqual(calendar.count(start, end)[1], 8)
+
+    @override_settings(COMPANY_HOLIDAYS=["2024-12-24"])
+    def test_company_holidays(self):
+        self.assertEqual(business_days_between(date(2024, 12, 23), date(2024, 12, 27)), 3)
+
+    def test_invalid_interval(self):
+        self.assertIsNone(business_days_between(date(2024, 12, 27), date(2024, 12, 23)))
+        self.assertIsNone(business_days_between(None, date(2024, 12, 23)))
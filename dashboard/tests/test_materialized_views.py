@@ -0,0 +1,85 @@
+import io
+import unittest
+from datetime import date
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from dashboard.models import (
+    BacklogSummary, BacklogSummaryView, DeliveryProgress, DeliveryProgressView, WorkItem,
+)
+from dashboard.utils.materialized_views import refresh_materialized_views
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "Materialized views só existem no PostgreSQL")
+class MaterializedViewsTests(TestCase):
+    def setUp(self):
+        year = date.today().year
+        items = [
+            # (tipo, criado em, resolvido em, arquivado)
+            ("Bug", date(year, 1, 3), date(year, 1, 20), False),
+            ("Bug", date(year, 1, 5), date(year, 2, 10), False),
+            ("Bug", date(year, 2, 1), date(year, 2, 15), False),
+            ("Task", date(year, 1, 8), date(year, 1, 9), False),
+            ("Task", date(year, 2, 2), date(year, 2, 28), True),
+            ("Incident", date(year - 1, 12, 1), date(year, 1, 2), False),
+            ("UserStory", date(year, 3, 1), None, False),
+        ]
+        WorkItem.objects.bulk_create([
+            WorkItem(external_id=index, title=f"{work_type} {index}", type=work_type, state="Resolved",
+                     created_date=created, changed_date=resolved or created, resolved_date=resolved,
+                     archived=archived)
+            for index, (work_type, created, resolved, archived) in enumerate(items)
+        ])
+
+    def populate_tables(self):
+        with override_settings(SUMMARY_MATERIALIZED_VIEWS=False):
+            call_command("populate_summary_data", stdout=io.StringIO())
+
+    def test_views_match_populate_summary_data(self):
+        self.populate_tables()
+        self.assertTrue(refresh_materialized_views())
+
+        fields = ("month", "year", "type", "total_items", "closed_items")
+        self.assertEqual(
+            sorted(DeliveryProgressView.objects.values_list(*fields)),
+            sorted(DeliveryProgress.objects.values_list(*fields)),
+        )
+        fields = ("type", "month", "year", "backlog_count")
+        self.assertEqual(
+            sorted(BacklogSummaryView.objects.values_list(*fields)),
+            sorted(BacklogSummary.objects.values_list(*fields)),
+        )
+        self.assertTrue(DeliveryProgressView.objects.exists())
+
+    def test_refresh_picks_up_changes(self):
+        refresh_materialized_views()
+        before = DeliveryProgressView.objects.get(type="Bug", month__month=2).closed_items
+
+        WorkItem.objects.filter(type="Bug", created_date__month=2).update(archived=True)
+        refresh_materialized_views()
+
+        self.assertEqual(DeliveryProgressView.objects.get(type="Bug", month__month=2).closed_items, before - 1)
+
+    def test_ids_survive_new_buckets(self):
+        refresh_materialized_views()
+        year = date.today().year
+        before = DeliveryProgressView.objects.get(type="Bug", month__month=2).pk
+        self.assertEqual(before, f"{year}02-Bug")
+
+        # Bucket novo ordenado antes dos existentes: com row_number() os ids mudariam
+        WorkItem.objects.create(external_id=100, title="UserStory 100", type="UserStory", state="Resolved",
+                                created_date=date(year, 1, 2), changed_date=date(year, 1, 3),
+                                resolved_date=date(year, 1, 3))
+        refresh_materialized_views()
+
+        self.assertEqual(DeliveryProgressView.objects.get(type="Bug", month__month=2).pk, before)
+        self.assertTrue(DeliveryProgressView.objects.filter(pk=f"{year}01-UserStory").exists())
+
+    def test_saves_do_not_write_delivery_progress_table(self):
+        item = WorkItem.objects.get(type="UserStory")
+        item.resolved_date = item.created_date
+        item.save()
+
+        self.assertFalse(DeliveryProgress.objects.exists())
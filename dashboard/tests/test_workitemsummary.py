@@ -0,0 +1,99 @@
+import io
+from datetime import date
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from dashboard.models import WorkItem, WorkItemHistory, WorkItemSummary
+
+
+class WorkItemSummaryTests(TestCase):
+    def setUp(self):
+        items = [
+            # (id, tipo, estado, criado em, resolvido em, lead time)
+            (1, "Bug", "Resolved", date(2024, 1, 2), date(2024, 1, 10), 5),
+            (2, "Bug", "Resolved", date(2024, 1, 3), date(2024, 1, 20), 3),
+            (3, "Bug", "Active", date(2024, 1, 4), date(2024, 1, 25), None),
+            (4, "Task", "Resolved", date(2024, 2, 1), date(2024, 2, 5), 2),
+        ]
+        # bulk_create não dispara os sinais: os resumos só vêm do comando
+        WorkItem.objects.bulk_create([
+            WorkItem(external_id=external_id, title=f"{work_type} {external_id}", type=work_type, state=state,
+                     created_date=created, changed_date=resolved, resolved_date=resolved, lead_time=lead_time)
+            for external_id, work_type, state, created, resolved, lead_time in items
+        ])
+        history = {
+            # Reativado depois de resolvido: rework
+            1: [("New", date(2024, 1, 2)), ("Resolved", date(2024, 1, 5)), ("Active", date(2024, 1, 7)),
+                ("Resolved", date(2024, 1, 10))],
+            2: [("New", date(2024, 1, 3)), ("Resolved", date(2024, 1, 20))],
+            # Resolvido e reativado no mesmo dia: a ordem vem do id
+            3: [("New", date(2024, 1, 4)), ("Resolved", date(2024, 1, 25)), ("Active", date(2024, 1, 25))],
+            4: [("New", date(2024, 2, 1)), ("Resolved", date(2024, 2, 5))],
+        }
+        WorkItemHistory.objects.bulk_create([
+            WorkItemHistory(work_item=WorkItem.objects.get(external_id=external_id), state=state, changed_date=changed)
+            for external_id, states in history.items()
+            for state, changed in states
+        ])
+
+    def populate(self, *args):
+        call_command("populate_workitemsummary", *args, stdout=io.StringIO())
+
+    def summary(self, work_type, month):
+        return WorkItemSummary.objects.get(type=work_type, year=2024, month=month)
+
+    def touch(self, external_id, **fields):
+        # update() também não dispara sinais; updated_at marca o item para o refresh incremental
+        WorkItem.objects.filter(external_id=external_id).update(updated_at=timezone.now(), **fields)
+
+    def test_full_refresh(self):
+        self.populate()
+
+        bug = self.summary("Bug", 1)
+        self.assertEqual(bug.total_count, 3)
+        self.assertAlmostEqual(float(bug.average_lead_time), 4.0)
+        self.assertAlmostEqual(float(bug.closed_percentage), 66.67, places=2)
+        self.assertAlmostEqual(float(bug.rework_percentage), 66.67, places=2)
+
+        task = self.summary("Task", 2)
+        self.assertEqual(task.total_count, 1)
+        self.assertAlmostEqual(float(task.rework_percentage), 0.0)
+
+    def test_resolution_before_reactivation_is_required_for_rework(self):
+        WorkItemHistory.objects.filter(work_item__external_id=3, state="Resolved").update(changed_date=date(2024, 1, 26))
+        self.populate()
+
+        self.assertAlmostEqual(float(self.summary("Bug", 1).rework_percentage), 33.33, places=2)
+
+    def test_incremental_recalculates_only_changed_buckets(self):
+        self.populate()
+        # Valor adulterado: só seria corrigido se o bucket fosse recalculado
+        WorkItemSummary.objects.filter(type="Task").update(total_count=99)
+
+        self.touch(2, archived=True)
+        self.populate("--incremental")
+
+        self.assertEqual(self.summary("Bug", 1).total_count, 2)
+        self.assertEqual(self.summary("Task", 2).total_count, 99)
+
+    def test_incremental_removes_emptied_bucket(self):
+        self.populate()
+
+        self.touch(4, archived=True)
+        self.populate("--incremental")
+
+        self.assertFalse(WorkItemSummary.objects.filter(type="Task").exists())
+        self.assertEqual(self.summary("Bug", 1).total_count, 3)
+
+    def test_save_recalculates_the_bucket_the_item_leaves(self):
+        self.populate()
+
+        item = WorkItem.objects.get(external_id=2)
+        item.type = "Task"
+        item.resolved_date = date(2024, 2, 10)
+        item.save()
+
+        self.assertEqual(self.summary("Bug", 1).total_count, 2)
+        self.assertEqual(self.summary("Task", 2).total_count, 2)
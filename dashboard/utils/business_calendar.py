@@ -0,0 +1,135 @@
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+
+# Feriados nacionais de data fixa (mês, dia)
+FIXED_HOLIDAYS = [
+    (1, 1),    # Confraternização Universal
+    (4, 21),   # Tiradentes
+    (5, 1),    # Dia do Trabalho
+    (9, 7),    # Independência
+    (10, 12),  # Nossa Senhora Aparecida
+    (11, 2),   # Finados
+    (11, 15),  # Proclamação da República
+    (12, 25),  # Natal
+]
+# Dia Nacional de Zumbi e da Consciência Negra, feriado nacional a partir de 2024
+BLACK_CONSCIOUSNESS_DAY_SINCE = 2024
+
+
+def easter(year):
+    """
+    Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher, calendário gregoriano).
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def brazilian_holidays(year, optional=True):
+    """
+    Feriados nacionais do ano. Com `optional`, inclui os pontos facultativos de
+    Carnaval (segunda e terça) e Corpus Christi.
+    """
+    holidays = [date(year, month, day) for month, day in FIXED_HOLIDAYS]
+    if year >= BLACK_CONSCIOUSNESS_DAY_SINCE:
+        holidays.append(date(year, 11, 20))
+
+    easter_sunday = easter(year)
+    holidays.append(easter_sunday - timedelta(days=2))  # Sexta-feira Santa
+    if optional:
+        holidays.append(easter_sunday - timedelta(days=48))  # Segunda de Carnaval
+        holidays.append(easter_sunday - timedelta(days=47))  # Terça de Carnaval
+        holidays.append(easter_sunday + timedelta(days=60))  # Corpus Christi
+    return sorted(holidays)
+
+
+class BusinessCalendar:
+    """
+    Índice de dias úteis (segunda a sexta, exceto feriados) para um intervalo de datas.
+
+    Guarda a contagem acumulada de dias úteis até cada data; a quantidade de dias úteis
+    entre duas datas vira uma subtração de duas posições do índice. Datas fora do
+    intervalo são calculadas com numpy.busday_count e os feriados dos anos envolvidos,
+    gerados por `holiday_source(ano_inicial, ano_final)` (ou só `holidays`, sem ela).
+    """
+
+    def __init__(self, start, end, holidays=(), holiday_source=None):
+        self.start = np.datetime64(start, "D")
+        self.end = np.datetime64(end, "D")
+        self.holidays = np.array(sorted(holidays), dtype="datetime64[D]")
+        self.holiday_source = holiday_source
+        days = np.arange(self.start, self.end + np.timedelta64(1, "D"))
+        self.is_business_day = np.is_busday(days, holidays=self.holidays)
+        # cumulative[i] = dias úteis de start até start + i, inclusive
+        self.cumulative = np.cumsum(self.is_business_day, dtype=np.int64)
+
+    def count(self, start_dates, end_dates):
+        """
+        Dias úteis entre cada par de datas (datetime64[D]), inclusive nas duas pontas.
+        Os pares precisam ser válidos (sem NaT e início <= fim).
+        """
+        start_dates = np.asarray(start_dates, dtype="datetime64[D]")
+        end_dates = np.asarray(end_dates, dtype="datetime64[D]")
+        counts = np.empty(start_dates.shape, dtype=np.int64)
+
+        indexed = (start_dates >= self.start) & (end_dates <= self.end)
+        first = (start_dates[indexed] - self.start).astype(np.int64)
+        last = (end_dates[indexed] - self.start).astype(np.int64)
+        counts[indexed] = self.cumulative[last] - self.cumulative[first] + self.is_business_day[first]
+
+        outside = ~indexed
+        if outside.any():
+            counts[outside] = np.busday_count(
+                start_dates[outside], end_dates[outside] + np.timedelta64(1, "D"),
+                holidays=self._holidays_between(start_dates[outside].min(), end_dates[outside].max()),
+            )
+        return counts
+
+    def _holidays_between(self, first, last):
+        if self.holiday_source is None:
+            return self.holidays
+        first_year = first.astype("datetime64[Y]").astype(int) + 1970
+        last_year = last.astype("datetime64[Y]").astype(int) + 1970
+        return np.array(sorted(self.holiday_source(first_year, last_year)), dtype="datetime64[D]")
+
+
+def calendar_holidays(start_year, end_year, company_holidays=(), optional=True):
+    """
+    Feriados nacionais dos anos informados mais os feriados da empresa (AAAA-MM-DD).
+    """
+    holidays = [day for year in range(start_year, end_year + 1) for day in brazilian_holidays(year, optional)]
+    holidays += [date.fromisoformat(day) for day in company_holidays]
+    return holidays
+
+
+@lru_cache(maxsize=8)
+def build_calendar(start_year, end_year, company_holidays=(), optional=True):
+    return BusinessCalendar(
+        date(start_year, 1, 1),
+        date(end_year, 12, 31),
+        calendar_holidays(start_year, end_year, company_holidays, optional),
+        holiday_source=lambda first, last: calendar_holidays(first, last, company_holidays, optional),
+    )
+
+
+def get_calendar():
+    """
+    Calendário configurado nas settings, construído uma vez por processo.
+    """
+    return build_calendar(
+        getattr(settings, 'BUSINESS_CALENDAR_START_YEAR', 2015),
+        getattr(settings, 'BUSINESS_CALENDAR_END_YEAR', 2035),
+        tuple(getattr(settings, 'COMPANY_HOLIDAYS', ())),
+        getattr(settings, 'BUSINESS_CALENDAR_OPTIONAL_HOLIDAYS', True),
+    )
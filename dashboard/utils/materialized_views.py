@@ -0,0 +1,36 @@
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+# Materialized views criadas pela migração 0004 (somente PostgreSQL)
+DELIVERY_PROGRESS_VIEW = "dashboard_deliveryprogress_mv"
+BACKLOG_SUMMARY_VIEW = "dashboard_backlogsummary_mv"
+MATERIALIZED_VIEWS = [DELIVERY_PROGRESS_VIEW, BACKLOG_SUMMARY_VIEW]
+
+
+def materialized_views_enabled():
+    return getattr(settings, 'SUMMARY_MATERIALIZED_VIEWS', True) and connection.vendor == "postgresql"
+
+
+def refresh_materialized_views():
+    """
+    Atualiza as materialized views com REFRESH ... CONCURRENTLY: o recálculo roda no
+    servidor e os leitores continuam vendo a versão anterior até o fim. Retorna False
+    quando as views não estão em uso (o chamador mantém as tabelas).
+    """
+    if not materialized_views_enabled():
+        return False
+    with connection.cursor() as cursor:
+        for view in MATERIALIZED_VIEWS:
+            cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+    logging.info(f"Materialized views atualizadas: {', '.join(MATERIALIZED_VIEWS)}.")
+    return True
+
+
+def backlog_summary_model():
+    """
+    Model de leitura do BacklogSummary: a materialized view no PostgreSQL, a tabela nos demais.
+    """
+    from dashboard.models import BacklogSummary, BacklogSummaryView
+    return BacklogSummaryView if materialized_views_enabled() else BacklogSummary
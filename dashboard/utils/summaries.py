@@ -0,0 +1,102 @@
+from django.db import transaction
+from django.db.models import Count, Avg, Exists, F, OuterRef, Q
+
+from dashboard.models import WorkItemHistory, WorkItemSummary
+
+# Estados que, depois de um Resolved no histórico, caracterizam rework
+REACTIVATION_STATES = ['Active', 'Reopened', 'New']
+# Estado contado como fechado em closed_percentage e no lead time médio
+CLOSED_STATE = 'Resolved'
+
+SUMMARY_FIELDS = ['total_count', 'average_lead_time', 'closed_percentage', 'rework_percentage', 'refreshed_at']
+
+
+def rework_filter():
+    """
+    Condição de rework do Work Item: no histórico, um estado Resolved seguido (depois,
+    ou no mesmo dia com id maior) de uma reativação.
+    """
+    earlier_resolution = WorkItemHistory.objects.filter(
+        work_item=OuterRef('work_item'),
+        state='Resolved',
+    ).filter(
+        Q(changed_date__lt=OuterRef('changed_date'))
+        | Q(changed_date=OuterRef('changed_date'), id__lt=OuterRef('id'))
+    )
+    reactivation = WorkItemHistory.objects.filter(
+        work_item=OuterRef('pk'),
+        state__in=REACTIVATION_STATES,
+    ).filter(Exists(earlier_resolution))
+    return Exists(reactivation)
+
+
+def aggregate_buckets(work_items):
+    """
+    Agrega os Work Items resolvidos por tipo e mês de resolução em uma única consulta:
+    contagens, lead time médio e rework a partir do histórico.
+    """
+    return work_items.annotate(
+        year=F('resolved_date__year'),
+        month=F('resolved_date__month')
+    ).values('type', 'year', 'month').annotate(
+        total_count=Count('id'),
+        closed_count=Count('id', filter=Q(state=CLOSED_STATE)),
+        average_lead_time=Avg('lead_time', filter=Q(state=CLOSED_STATE)),
+        rework_count=Count('id', filter=rework_filter()),
+    ).order_by()
+
+
+def build_summary(bucket, refreshed_at):
+    """
+    Monta o WorkItemSummary (não salvo) de um bucket agregado por aggregate_buckets.
+    """
+    total_count = bucket['total_count']
+
+    # Porcentagens de itens fechados e de rework (resolvidos e reativados depois)
+    closed_percentage = (bucket['closed_count'] / total_count) * 100 if total_count > 0 else 0.0
+    rework_percentage = (bucket['rework_count'] / total_count) * 100 if total_count > 0 else 0.0
+
+    return WorkItemSummary(
+        type=bucket['type'],
+        year=bucket['year'],
+        month=bucket['month'],
+        total_count=total_count,
+        average_lead_time=bucket['average_lead_time'] or 0.0,
+        closed_percentage=closed_percentage,
+        rework_percentage=rework_percentage,
+        refreshed_at=refreshed_at,
+    )
+
+
+def aggregate_summaries(work_items, refreshed_at):
+    """
+    Monta as instâncias de WorkItemSummary (não salvas) de todos os buckets dos Work Items.
+    """
+    return [build_summary(bucket, refreshed_at) for bucket in aggregate_buckets(work_items)]
+
+
+def bucket_filter(buckets, year_field='resolved_date__year', month_field='resolved_date__month'):
+    """
+    Q que seleciona os registros dos buckets (tipo, ano, mês) informados; por padrão,
+    os Work Items pelo mês de resolução.
+    """
+    condition = Q()
+    for work_type, year, month in buckets:
+        condition |= Q(type=work_type, **{year_field: year, month_field: month})
+    return condition
+
+
+def write_summaries(summaries, stale, refreshed_at):
+    """
+    Grava os resumos com um único INSERT ... ON CONFLICT (tipo, ano, mês) e remove, na
+    mesma transação, os resumos de `stale` que não foram regravados neste refresh.
+    """
+    with transaction.atomic():
+        WorkItemSummary.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=['type', 'year', 'month'],
+            update_fields=SUMMARY_FIELDS,
+        )
+        removed, _ = stale.exclude(refreshed_at=refreshed_at).delete()
+    return removed
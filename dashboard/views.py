@@ -10,8 +10,9 @@ from django.views.decorators.cache import cache_page
 from django.views.generic import TemplateView
 
 from app.mixins import SidebarContextMixin
+from dashboard.utils.materialized_views import backlog_summary_model
 from dashboard.utils.plotly_charts import create_chart
-from .models import BacklogSummary, WorkItemSummary
+from .models import WorkItemSummary
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,8 @@ class DeliveriesView(SidebarContextMixin, TemplateView):
         # 1. Cards de Lead Time Médio
         # ------------------------------
 
-        # Backlog Total
+        # Backlog Total (materialized view no PostgreSQL, tabela nos demais bancos)
+        BacklogSummary = backlog_summary_model()
         backlog_user_story = BacklogSummary.objects.filter(type="UserStory").first()
         backlog_incident = BacklogSummary.objects.filter(type="Incident").first()
         total_backlog = (backlog_user_story.backlog_count if backlog_user_story else 0) + (
@@ -156,6 +158,7 @@ class PerformanceView(SidebarContextMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        BacklogSummary = backlog_summary_model()
 
         # Verifica o mês mais recente disponível
         latest_summary = WorkItemSummary.objects.order_by('-year', '-month').first()
@@ -0,0 +1,161 @@
+"""
+Reprocessa os arquivos brutos arquivados em etl/data/archive/.
+
+Os arquivos são transformados em paralelo (um processo por arquivo) e carregados em
+ordem cronológica por um único processo, enquanto os seguintes ainda são transformados.
+Linhas com changed_date anterior à do Work Item gravado são ignoradas na carga, então
+reprocessar arquivos antigos não reverte os itens a versões anteriores:
+
+    python etl/scripts/backfill.py --workers 8 --since 2024-01-01 --until 2024-12-31
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Adicionar o diretório raiz ao PYTHONPATH
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, BASE_DIR)
+
+from etl.scripts.transform import transform_frame
+from etl.utils.storage import PROCESSED_SCHEMA, RAW_SCHEMA, artifact_path, read_frame, write_frame
+
+ARCHIVE_DIR = os.path.join(BASE_DIR, "etl/data/archive/")
+# Mesma configuração do run_etl: com o histórico vindo das revisões, o snapshot por
+# arquivo duplicaria as transições em WorkItemHistory
+REVISION_HISTORY = os.getenv('ETL_REVISION_HISTORY', 'True') == 'True'
+RAW_FILE = re.compile(r"^work_items_raw_(\d{4}-\d{2}-\d{2})\.(csv|parquet)$")
+
+
+def find_archived_files(archive_dir=ARCHIVE_DIR, since=None, until=None):
+    """
+    Lista (data, caminho) dos arquivos brutos arquivados, em ordem cronológica.
+    Se houver CSV e Parquet da mesma data, usa o Parquet.
+    """
+    files = {}
+    for name in os.listdir(archive_dir):
+        match = RAW_FILE.match(name)
+        if not match:
+            continue
+        day, extension = match.groups()
+        if (since and day < since) or (until and day > until):
+            continue
+        if day not in files or extension == "parquet":
+            files[day] = os.path.join(archive_dir, name)
+    return sorted(files.items())
+
+
+def transform_archived_file(raw_path, output_dir):
+    """
+    Executado nos processos do pool: transforma um arquivo bruto e grava o processado.
+    Retorna (caminho processado ou None, linhas, segundos).
+    """
+    started = time.perf_counter()
+    df = transform_frame(read_frame(raw_path, RAW_SCHEMA))
+    if df is None or df.empty:
+        return None, 0, time.perf_counter() - started
+
+    stem = os.path.splitext(os.path.basename(raw_path))[0].replace("_raw_", "_transformed_")
+    processed_path = artifact_path(output_dir, stem)
+    write_frame(df, processed_path, PROCESSED_SCHEMA)
+    return processed_path, len(df), time.perf_counter() - started
+
+
+def run_backfill(files, output_dir, workers=None, record_history=None):
+    """
+    Transforma `files` no pool e carrega cada resultado, na ordem recebida, assim que
+    ele e os anteriores estiverem prontos. Sem `record_history`, o snapshot só vai para
+    WorkItemHistory quando o histórico não vem das revisões (como no run_etl).
+    Retorna as estatísticas por arquivo.
+    """
+    record_history = not REVISION_HISTORY if record_history is None else record_history
+    # Importação tardia: os processos do pool não precisam do Django
+    from dashboard.signals import bulk_ingest
+    from dashboard.utils.materialized_views import refresh_materialized_views
+    from etl.scripts.load import load_data_to_db
+
+    report = []
+    with ProcessPoolExecutor(max_workers=workers) as pool, bulk_ingest():
+        futures = [(day, raw_path, pool.submit(transform_archived_file, raw_path, output_dir))
+                   for day, raw_path in files]
+        for day, raw_path, future in futures:
+            try:
+                processed_path, rows, transform_seconds = future.result()
+            except Exception as e:
+                logging.error(f"Erro ao transformar {raw_path}: {e}")
+                report.append({"day": day, "rows": 0, "transform_s": 0.0, "load_s": 0.0, "error": str(e)})
+                continue
+            if processed_path is None:
+                logging.warning(f"Nenhum dado transformado em {raw_path}.")
+                report.append({"day": day, "rows": 0, "transform_s": round(transform_seconds, 3), "load_s": 0.0})
+                continue
+
+            # Um único processo grava no banco, em ordem cronológica
+            started = time.perf_counter()
+            loaded = load_data_to_db(processed_path, record_history=record_history)
+            load_seconds = time.perf_counter() - started
+            os.remove(processed_path)
+
+            if loaded is None:
+                logging.error(f"Erro ao carregar {raw_path}.")
+                report.append({"day": day, "rows": 0, "transform_s": round(transform_seconds, 3),
+                                "load_s": round(load_seconds, 3), "error": "falha na carga (ver log)"})
+                continue
+            report.append({
+                "day": day,
+                "rows": rows,
+                "transform_s": round(transform_seconds, 3),
+                "load_s": round(load_seconds, 3),
+            })
+            logging.info(f"{day}: {rows} linhas, transformação {transform_seconds:.2f}s, carga {load_seconds:.2f}s.")
+    refresh_materialized_views()
+    return report
+
+
+def print_report(report, wall_time):
+    header = f"{'data':<12} {'linhas':>9} {'transf. (s)':>12} {'carga (s)':>10} {'linhas/s':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in report:
+        seconds = r["transform_s"] + r["load_s"]
+        rate = round(r["rows"] / seconds, 1) if seconds else 0.0
+        print(f"{r['day']:<12} {r['rows']:>9} {r['transform_s']:>12} {r['load_s']:>10} {rate:>10}"
+              + (f"  ERRO: {r['error']}" if r.get("error") else ""))
+    total_rows = sum(r["rows"] for r in report)
+    print(f"\n{len(report)} arquivos, {total_rows} linhas em {wall_time:.1f}s "
+          f"({total_rows / wall_time if wall_time else 0:.1f} linhas/s).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprocessa os arquivos brutos arquivados.")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--since", help="Primeira data (AAAA-MM-DD), inclusive.")
+    parser.add_argument("--until", help="Última data (AAAA-MM-DD), inclusive.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processos de transformação.")
+    parser.add_argument("--history", action="store_true", default=None,
+                        help="Grava o snapshot em WorkItemHistory mesmo com ETL_REVISION_HISTORY ativo.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    import django
+    django.setup()
+
+    files = find_archived_files(args.archive_dir, args.since, args.until)
+    if not files:
+        logging.warning("Nenhum arquivo bruto encontrado para reprocessar.")
+        return
+    logging.info(f"Reprocessando {len(files)} arquivos com {args.workers} processos...")
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as output_dir:
+        report = run_backfill(files, output_dir, workers=args.workers, record_history=args.history)
+    print_report(report, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
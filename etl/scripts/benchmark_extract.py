@@ -0,0 +1,123 @@
+"""
+Benchmark de throughput da extração contra o servidor mock do Azure DevOps.
+
+Executa cada modo de extração sobre o mesmo conjunto sintético e reporta itens/s,
+latência p50/p99 das requisições e tempo total:
+
+    python etl/scripts/benchmark_extract.py --size 5000 --latency-ms 30 --modes batch async
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import tempfile
+
+# Adicionar o diretório raiz ao PYTHONPATH
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+sys.path.insert(0, BASE_DIR)
+
+from etl.utils.mock_azure_devops import start_in_background
+
+MODES = ["single", "batch", "async"]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def count_rows(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding='utf-8') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def run_mode(extract, mode, work_dir, streaming):
+    """
+    Executa uma extração completa isolada (cliente HTTP e checkpoint próprios).
+    """
+    output_path = os.path.join(work_dir, f"work_items_raw_{mode}.csv")
+    extract.CHECKPOINT_FILE = os.path.join(work_dir, f"checkpoint_{mode}.json")
+    extract.ITEM_CACHE_FILE = os.path.join(work_dir, f"cache_{mode}.sqlite3")
+    extract._journal = None
+    extract._client = None
+    extract._cache = None
+
+    started = time.perf_counter()
+    extract.run_extract(output_path, mode=mode, full_refresh=True, streaming=streaming)
+    wall_time = time.perf_counter() - started
+
+    stats = extract.get_client().stats
+    items = count_rows(output_path)
+    return {
+        "mode": mode,
+        "items": items,
+        "wall_time_s": round(wall_time, 3),
+        "items_per_s": round(items / wall_time, 1) if wall_time else 0.0,
+        "requests": stats.requests,
+        "p50_ms": round(percentile(stats.latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(stats.latencies, 99) * 1000, 2),
+        "new_connections": stats.new_connections,
+        "reused_connections": stats.reused_connections,
+    }
+
+
+def print_report(results):
+    header = f"{'modo':<8} {'itens':>8} {'itens/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'total (s)':>10} {'reqs':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['mode']:<8} {r['items']:>8} {r['items_per_s']:>10} {r['p50_ms']:>10} "
+              f"{r['p99_ms']:>10} {r['wall_time_s']:>10} {r['requests']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos modos de extração contra o mock do Azure DevOps.")
+    parser.add_argument("--size", type=int, default=2000, help="Quantidade de Work Items sintéticos.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--latency-ms", type=float, default=20, help="Latência por resposta do mock.")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--throttle-every", type=int, default=0, help="429 a cada N requisições.")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--error-rate", type=float, default=0, help="Fração de respostas 503.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-streaming", action="store_true", help="Mantém os itens em memória até o fim.")
+    parser.add_argument("--json", dest="json_path", help="Salva os resultados em JSON.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    server, url = start_in_background(
+        size=args.size, latency=args.latency_ms / 1000, jitter=args.jitter,
+        throttle_every=args.throttle_every, retry_after=args.retry_after,
+        error_rate=args.error_rate, seed=args.seed,
+    )
+
+    # O extrator lê a configuração da API na importação
+    os.environ.update({
+        "AZURE_DEVOPS_URL": url,
+        "AZURE_DEVOPS_ORG": "benchmark",
+        "AZURE_DEVOPS_PROJECT": "benchmark",
+        "AZURE_DEVOPS_PAT": "benchmark",
+    })
+    from etl.scripts import extract
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for mode in args.modes:
+            results.append(run_mode(extract, mode, work_dir, streaming=not args.no_streaming))
+    server.shutdown()
+
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
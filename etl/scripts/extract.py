@@ -1,12 +1,18 @@
 import os
 import logging
 import time
-import json
-from requests.auth import HTTPBasicAuth
+import asyncio
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_fixed
-import requests
+from tenacity import retry, stop_after_attempt, wait_fixed, RetryError
 import csv
+from concurrent.futures import ThreadPoolExecutor
+
+from etl.utils.checkpoint import CheckpointJournal
+from etl.utils.csv_writer import StreamingCsvWriter
+from etl.utils.http_client import AzureDevOpsClient
+from etl.utils.item_cache import WorkItemCache
+from etl.utils.storage import RAW_SCHEMA, frame_from_records
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -15,6 +21,37 @@ load_dotenv()
 organization = os.getenv('AZURE_DEVOPS_ORG')
 project = os.getenv('AZURE_DEVOPS_PROJECT')
 pat = os.getenv('AZURE_DEVOPS_PAT')
+# URL base da API (pode apontar para o servidor mock local em testes offline)
+api_url = os.getenv('AZURE_DEVOPS_URL', 'https://dev.azure.com').rstrip('/')
+
+# Modo de extração: "batch" (workitemsbatch, até 200 IDs por requisição), "single" (um GET por item)
+# ou "async" (lotes concorrentes via aiohttp, ver extract_async.py)
+EXTRACT_MODE = os.getenv('ETL_EXTRACT_MODE', 'batch')
+# Limite do endpoint workitemsbatch do Azure DevOps
+MAX_BATCH_SIZE = 200
+BATCH_SIZE = min(int(os.getenv('ETL_BATCH_SIZE', MAX_BATCH_SIZE)), MAX_BATCH_SIZE)
+
+# Campos extraídos de cada Work Item
+FIELDS = ["System.Title", "System.State", "System.CreatedDate",
+          "System.ChangedDate", "System.AssignedTo", "System.WorkItemType"]
+CSV_COLUMNS = ["id"] + FIELDS
+
+# Streaming: grava as linhas no CSV durante a extração e retoma arquivos parciais
+STREAMING = os.getenv('ETL_STREAMING', 'True') == 'True'
+
+# Uma consulta WIQL retorna no máximo 20.000 IDs; acima disso a enumeração é particionada
+WIQL_MAX_RESULTS = 20000
+WIQL_PARTITION_SIZE = min(int(os.getenv('ETL_WIQL_PARTITION_SIZE', WIQL_MAX_RESULTS)), WIQL_MAX_RESULTS)
+WIQL_CONCURRENCY = int(os.getenv('ETL_WIQL_CONCURRENCY', 4))
+
+# Extração incremental: busca apenas itens alterados desde o último System.ChangedDate extraído
+INCREMENTAL = os.getenv('ETL_INCREMENTAL', 'True') == 'True'
+# Janela de segurança subtraída do watermark (atrasos de indexação e relógios diferentes)
+WATERMARK_OVERLAP = timedelta(minutes=int(os.getenv('ETL_WATERMARK_OVERLAP_MINUTES', 60)))
+
+# Cache de revisões: em extrações completas, só baixa os itens cujo System.Rev mudou
+ITEM_CACHE = os.getenv('ETL_ITEM_CACHE', 'True') == 'True'
+ITEM_CACHE_FILE = os.getenv('ETL_ITEM_CACHE_FILE', 'etl/cache/work_items.sqlite3')
 
 # Configuração do logger
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -23,25 +60,108 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 CHECKPOINT_FILE = "etl/checkpoints/last_extracted.json"
 os.makedirs(os.path.dirname(CHECKPOINT_FILE), exist_ok=True)
 
-# Cabeçalhos da requisição
-HEADERS = {'Content-Type': 'application/json'}
+def wit_url(path):
+    return f"{api_url}/{organization}/{project}/_apis/wit/{path}"
+
+# Cliente HTTP compartilhado (pool de conexões keep-alive), criado sob demanda
+_client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = AzureDevOpsClient(pat)
+    return _client
+
+# Checkpoint da extração (snapshot + journal append-only), criado sob demanda
+_journal = None
+
+def get_journal():
+    global _journal
+    if _journal is None:
+        _journal = CheckpointJournal(CHECKPOINT_FILE)
+    return _journal
 
-def save_checkpoint(last_id):
+def save_checkpoint(work_item_ids):
+    """
+    Registra os IDs concluídos no journal; a gravação em disco acontece em lote.
+    """
+    get_journal().record_completed(list(work_item_ids))
+
+# Cache local de revisões e linhas extraídas, criado sob demanda
+_cache = None
+
+def get_cache():
+    global _cache
+    if not ITEM_CACHE:
+        return None
+    if _cache is None:
+        # A assinatura invalida o cache se as colunas do CSV mudarem
+        _cache = WorkItemCache(ITEM_CACHE_FILE, signature=",".join(CSV_COLUMNS))
+    return _cache
+
+def parse_changed_date(value):
     try:
-        with open(CHECKPOINT_FILE, 'w') as f:
-            json.dump({"last_id": last_id}, f)
-    except Exception as e:
-        logging.error(f"Erro ao salvar checkpoint: {e}")
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
 
-def load_checkpoint():
-    if os.path.exists(CHECKPOINT_FILE):
-        try:
-            with open(CHECKPOINT_FILE, 'r') as f:
-                data = json.load(f)
-                return data.get("last_id", 0)
-        except Exception as e:
-            logging.warning(f"Erro ao carregar checkpoint: {e}")
-    return 0
+def load_watermark():
+    """
+    Retorna o maior System.ChangedDate já extraído (datetime UTC) ou None.
+    """
+    return parse_changed_date(get_journal().get("watermark"))
+
+def candidate_watermark(changed_dates):
+    """
+    Retorna o maior System.ChangedDate entre as datas informadas, no formato do
+    checkpoint, ou None. Só vira watermark com save_watermark, depois da carga.
+    """
+    latest = max(filter(None, map(parse_changed_date, changed_dates)), default=None)
+    return latest.strftime("%Y-%m-%dT%H:%M:%S.%fZ") if latest else None
+
+def save_watermark(watermark):
+    """
+    Avança o watermark para `watermark` (ver candidate_watermark), se for mais recente.
+    """
+    latest = parse_changed_date(watermark)
+    if latest is None:
+        return
+    current = load_watermark()
+    if current is None or latest > current:
+        get_journal().set("watermark", watermark)
+        logging.info(f"Watermark atualizado para {watermark}.")
+
+def watermark_from_items(work_items):
+    return candidate_watermark(item.get("fields", {}).get("System.ChangedDate") for item in work_items)
+
+def resolve_since(full_refresh=False):
+    """
+    Define o início da janela incremental (watermark - overlap) ou None para extração completa.
+    """
+    if full_refresh or not INCREMENTAL:
+        logging.info("Extração completa solicitada.")
+        return None
+    watermark = load_watermark()
+    if watermark is None:
+        logging.info("Nenhum watermark registrado. Executando extração completa.")
+        return None
+    since = watermark - WATERMARK_OVERLAP
+    logging.info(f"Extração incremental: itens alterados desde {since.isoformat()}.")
+    return since
+
+def build_wiql(since=None, id_range=None, descending=False):
+    conditions = []
+    if since is not None:
+        since_utc = since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        conditions.append(f"[System.ChangedDate] >= '{since_utc}'")
+    if id_range is not None:
+        lower, upper = id_range
+        conditions.append(f"[System.Id] >= {lower} AND [System.Id] < {upper}")
+
+    query = "SELECT [System.Id] FROM workitems"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return query + " ORDER BY [System.Id]" + (" DESC" if descending else "")
 
 def handle_rate_limiting(response):
     if response.status_code == 429:  # Too Many Requests
@@ -52,99 +172,380 @@ def handle_rate_limiting(response):
     return False
 
 @retry(stop=stop_after_attempt(5), wait=wait_fixed(2))
-def extract_work_item_ids():
-    url = f"https://dev.azure.com/{organization}/{project}/_apis/wit/wiql?api-version=6.0"
-    query = {"query": "SELECT [System.Id] FROM workitems"}
+def query_work_item_ids(wiql, top=WIQL_MAX_RESULTS):
+    # timePrecision=true faz o WIQL comparar ChangedDate com hora, não apenas a data
+    url = wit_url(f"wiql?api-version=6.0&timePrecision=true&$top={top}")
+    query = {"query": wiql}
 
-    response = requests.post(url, json=query, headers=HEADERS, auth=HTTPBasicAuth('', pat), timeout=10)
+    response = get_client().post(url, json=query, timeout=30)
     if handle_rate_limiting(response):
-        return extract_work_item_ids()
+        return query_work_item_ids(wiql, top)
     if response.status_code == 200:
         data = response.json()
         return [item['id'] for item in data.get('workItems', [])]
     else:
         response.raise_for_status()
 
-def extract_work_items(work_item_ids, start_index=0):
-    work_items = []
+def enumerate_work_item_ids_partitioned(since=None, partition_size=WIQL_PARTITION_SIZE,
+                                        concurrency=WIQL_CONCURRENCY):
+    """
+    Enumera os IDs em faixas de System.Id consultadas em paralelo.
+
+    Como os IDs são inteiros únicos, uma faixa com largura menor ou igual ao limite
+    do WIQL nunca é truncada, independentemente do tamanho do projeto.
+    """
+    latest = query_work_item_ids(build_wiql(since, descending=True), top=1)
+    if not latest:
+        return []
+
+    ranges = [(lower, lower + partition_size) for lower in range(1, latest[0] + 1, partition_size)]
+    logging.info(f"Enumerando IDs em {len(ranges)} faixas de {partition_size} IDs ({concurrency} consultas simultâneas).")
+
+    work_item_ids = set()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for ids in executor.map(lambda id_range: query_work_item_ids(build_wiql(since, id_range)), ranges):
+            work_item_ids.update(ids)
+    return sorted(work_item_ids)
+
+def extract_work_item_ids(since=None):
+    work_item_ids = query_work_item_ids(build_wiql(since))
+    if work_item_ids is not None and len(work_item_ids) >= WIQL_MAX_RESULTS:
+        logging.warning(f"A consulta WIQL atingiu o limite de {WIQL_MAX_RESULTS} resultados. "
+                        f"Usando enumeração particionada por System.Id.")
+        return enumerate_work_item_ids_partitioned(since)
+    return work_item_ids
+
+def record_failed(failed, work_item_ids):
+    """
+    Anota os IDs que não foram extraídos (lote com erro), se a chamada acompanha falhas.
+    """
+    if failed is not None:
+        failed.extend(work_item_ids)
+
+def iter_work_items(work_item_ids, start_index=0, failed=None):
+    """
+    Gera os Work Items um a um, à medida que são extraídos. Os IDs com erro vão para `failed`.
+    """
     for i in range(start_index, len(work_item_ids)):
         work_item_id = work_item_ids[i]
-        url = (f"https://dev.azure.com/{organization}/{project}/_apis/wit/workitems/{work_item_id}"
-               f"?api-version=6.0&fields=System.Title,System.State,System.CreatedDate,"
-               f"System.ChangedDate,System.AssignedTo")
+        url = wit_url(f"workitems/{work_item_id}?api-version=6.0&fields={','.join(FIELDS)}")
         try:
-            response = requests.get(url, headers=HEADERS, auth=HTTPBasicAuth('', pat), timeout=10)
+            response = get_client().get(url, timeout=10)
             if handle_rate_limiting(response):
+                record_failed(failed, [work_item_id])
                 continue
             if response.status_code == 200:
                 work_item = response.json()
                 logging.info(f"Detalhes do Work Item {work_item_id} extraídos com sucesso.")
-                work_items.append(work_item)
-                save_checkpoint(work_item_id)  # Atualizar o checkpoint
+                yield work_item
             else:
                 logging.error(f"Erro ao extrair Work Item {work_item_id}. Status: {response.status_code}")
+                record_failed(failed, [work_item_id])
         except Exception as e:
             logging.error(f"Erro ao processar Work Item {work_item_id}: {e}")
+            record_failed(failed, [work_item_id])
             time.sleep(5)  # Pausa antes de tentar o próximo item
-    return work_items
 
-def transform_and_save_to_csv(work_items, output_path):
-    if not work_items:
+@retry(stop=stop_after_attempt(5), wait=wait_fixed(2))
+def fetch_work_items_batch(batch_ids, fields=None):
+    """
+    Busca até MAX_BATCH_SIZE Work Items em uma única requisição ao endpoint workitemsbatch.
+    """
+    url = wit_url("workitemsbatch?api-version=6.0")
+    payload = {"ids": batch_ids, "fields": fields or FIELDS, "errorPolicy": "omit"}
+
+    response = get_client().post(url, json=payload)
+    if handle_rate_limiting(response):
+        return fetch_work_items_batch(batch_ids, fields)
+    response.raise_for_status()
+    # Com errorPolicy=omit, IDs inexistentes ou sem permissão retornam null
+    return [item for item in response.json().get('value', []) if item]
+
+def iter_work_items_batch(work_item_ids, start_index=0, batch_size=BATCH_SIZE, failed=None):
+    """
+    Gera os Work Items lote a lote (até 200 IDs por requisição), à medida que são extraídos.
+    Os IDs dos lotes com erro vão para `failed`.
+    """
+    for i in range(start_index, len(work_item_ids), batch_size):
+        batch_ids = work_item_ids[i:i + batch_size]
+        try:
+            batch = fetch_work_items_batch(batch_ids)
+            logging.info(f"Lote de {len(batch)} Work Items extraído ({i + len(batch_ids)}/{len(work_item_ids)}).")
+        except Exception as e:
+            logging.error(f"Erro ao processar lote iniciado no Work Item {batch_ids[0]}: {e}")
+            record_failed(failed, batch_ids)
+            continue
+        yield from batch
+
+def fetch_work_item_revs(work_item_ids):
+    """
+    Consulta apenas System.Rev dos IDs (payload mínimo), em lotes do workitemsbatch.
+    """
+    revs = {}
+    for i in range(0, len(work_item_ids), MAX_BATCH_SIZE):
+        for item in fetch_work_items_batch(work_item_ids[i:i + MAX_BATCH_SIZE], fields=["System.Rev"]):
+            revs[item["id"]] = item.get("rev", item.get("fields", {}).get("System.Rev"))
+    return revs
+
+def split_by_revision(work_item_ids, cache):
+    """
+    Separa os IDs em (a baixar, inalterados). Inalterados são os que estão no cache
+    com a mesma revisão atual; suas linhas saem direto do cache.
+    """
+    cached = cache.revisions(work_item_ids)
+    if not cached:
+        return work_item_ids, []
+    try:
+        current = fetch_work_item_revs([i for i in work_item_ids if i in cached])
+    except Exception as e:
+        logging.warning(f"Não foi possível comparar revisões; baixando todos os Work Items: {e}")
+        return work_item_ids, []
+
+    unchanged = {i for i, rev in current.items() if cached.get(i) == rev}
+    logging.info(f"Cache de revisões: {len(unchanged)} Work Items inalterados, "
+                 f"{len(work_item_ids) - len(unchanged)} a baixar.")
+    return [i for i in work_item_ids if i not in unchanged], [i for i in work_item_ids if i in unchanged]
+
+def cache_work_items(work_items, cache):
+    """
+    Repassa os Work Items, guardando a revisão e a linha de cada um no cache.
+    """
+    for item in work_items:
+        if cache is not None:
+            cache.put(item.get("id"), item.get("rev"), flatten_work_item(item))
+        yield item
+
+def flatten_work_item(item):
+    """
+    Converte a resposta JSON de um Work Item em uma linha do CSV bruto.
+    """
+    fields = item.get("fields", {})
+    return {
+        "id": item.get("id", ""),
+        "System.Title": fields.get("System.Title", ""),
+        "System.State": fields.get("System.State", ""),
+        "System.CreatedDate": fields.get("System.CreatedDate", ""),
+        "System.ChangedDate": fields.get("System.ChangedDate", ""),
+        "System.AssignedTo": fields.get("System.AssignedTo", {}).get("displayName", ""),
+        "System.WorkItemType": fields.get("System.WorkItemType", ""),
+    }
+
+def transform_and_save_to_csv(work_items, output_path, cached_rows=()):
+    if not work_items and not cached_rows:
         logging.warning("Nenhum Work Item para salvar.")
         return
 
-    keys = ["id", "System.Title", "System.State", "System.CreatedDate", 
-            "System.ChangedDate", "System.AssignedTo"]
-
     try:
         with open(output_path, 'w', newline='', encoding='utf-8') as output_file:
-            dict_writer = csv.DictWriter(output_file, fieldnames=keys)
+            dict_writer = csv.DictWriter(output_file, fieldnames=CSV_COLUMNS)
             dict_writer.writeheader()
             for item in work_items:
-                row = {}
-                row["id"] = item.get("id", "")
-                fields = item.get("fields", {})
-                row["System.Title"] = fields.get("System.Title", "")
-                row["System.State"] = fields.get("System.State", "")
-                row["System.CreatedDate"] = fields.get("System.CreatedDate", "")
-                row["System.ChangedDate"] = fields.get("System.ChangedDate", "")
-                row["System.AssignedTo"] = fields.get("System.AssignedTo", {}).get("displayName", "")
-                
+                row = flatten_work_item(item)
+
                 # Verifique se os dados estão completos
                 if any(row.values()):
                     dict_writer.writerow(row)
                 else:
                     logging.warning(f"Work Item com campos ausentes ou inválidos: {row}")
+            # Linhas de Work Items inalterados, vindas do cache de revisões
+            dict_writer.writerows(cached_rows)
         
         logging.info(f"Dados salvos com sucesso em {output_path}")
     except Exception as e:
         logging.error(f"Erro ao salvar CSV: {e}")
 
+def stream_to_csv(work_items, writer):
+    """
+    Grava cada Work Item no CSV assim que chega; nada é acumulado em memória.
+    O ID só vai para o checkpoint depois que a linha foi gravada.
+    """
+    for item in work_items:
+        row = flatten_work_item(item)
+        if row["id"]:
+            writer.write_row(row)
+            save_checkpoint([int(row["id"])])
+        else:
+            logging.warning(f"Work Item com campos ausentes ou inválidos: {row}")
 
-# Função para execução da extração
-def run_extract(output_path):
+def watermark_from_csv(output_path):
+    with open(output_path, newline='', encoding='utf-8') as f:
+        return candidate_watermark(row["System.ChangedDate"] for row in csv.DictReader(f))
+
+def hold_watermark(failed):
+    """
+    Com lotes falhos, não há watermark candidato: os itens desses lotes podem ser mais
+    antigos que a janela de overlap e não seriam buscados de novo na próxima execução.
+    """
+    if not failed:
+        return False
+    logging.warning(f"{len(failed)} Work Items não foram extraídos. Watermark mantido para que "
+                    f"sejam buscados na próxima execução.")
+    return True
+
+def run_extract_streaming(work_item_ids, output_path, mode, cached_ids=(), cache=None, failed=None):
+    """
+    Extrai gravando no CSV durante a extração. Após uma interrupção, o arquivo parcial
+    é retomado e os IDs concluídos no journal de checkpoint não são buscados novamente.
+    Os `cached_ids` (revisão inalterada) são gravados direto do cache; os IDs com erro
+    vão para `failed`.
+    """
+    journal = get_journal()
+    with StreamingCsvWriter(output_path, CSV_COLUMNS, track_ids=False) as writer:
+        if not writer.resumed:
+            # Arquivo novo ou recomeçado: IDs concluídos no journal não têm mais linha no CSV
+            journal.start_run(output_path, resume=False)
+        # O journal só registra IDs cujas linhas já foram descarregadas no CSV
+        journal.before_flush = writer.flush
+        try:
+            pending_cached = [i for i in cached_ids if i not in journal.completed]
+            for row in cache.rows(pending_cached) if pending_cached else ():
+                writer.write_row(row)
+                journal.record_completed([int(row["id"])])
+
+            pending_ids = [i for i in work_item_ids if i not in journal.completed]
+            logging.info(f"{len(pending_ids)} Work Items a extrair em modo streaming.")
+
+            if mode == "async":
+                # Importação tardia: extract_async depende deste módulo
+                from etl.scripts.extract_async import extract_work_items_async
+                asyncio.run(extract_work_items_async(
+                    pending_ids, on_batch=lambda batch: stream_to_csv(cache_work_items(batch, cache), writer),
+                    failed=failed))
+            elif mode == "batch":
+                stream_to_csv(cache_work_items(iter_work_items_batch(pending_ids, failed=failed), cache), writer)
+            else:
+                stream_to_csv(cache_work_items(iter_work_items(pending_ids, failed=failed), cache), writer)
+        finally:
+            # Também em caso de erro: o que já foi gravado no CSV fica registrado no journal
+            journal.flush()
+            journal.before_flush = None
+
+        logging.info(f"{writer.rows_written} Work Items gravados nesta execução.")
+        return len(journal.completed)
+
+def extract_frame(mode=None, full_refresh=False):
+    """
+    Extrai os Work Items direto para um DataFrame (modo fundido do run_etl), sem gravar o
+    arquivo bruto. Retorna (DataFrame, watermark candidato); o DataFrame é None se nada
+    foi extraído ou em caso de erro, e o watermark é None se algum lote falhou.
+    """
+    mode = mode or EXTRACT_MODE
     try:
-        logging.info("Iniciando extração dos Work Items...")
-        work_item_ids = extract_work_item_ids()
+        logging.info(f"Iniciando extração dos Work Items em memória (modo {mode})...")
+        get_journal().start_run("memory", resume=False)
+        since = resolve_since(full_refresh)
+        work_item_ids = extract_work_item_ids(since)
         if not work_item_ids:
             logging.warning("Nenhum ID de Work Item encontrado. Processo finalizado.")
-            return
+            return None, None
+
+        cache = get_cache()
+        cached_ids = []
+        if cache is not None and since is None:
+            work_item_ids, cached_ids = split_by_revision(work_item_ids, cache)
+
+        rows = []
+        failed = []
 
-        work_items = extract_work_items(work_item_ids)
-        if not work_items:
+        def collect(work_items):
+            for row in map(flatten_work_item, cache_work_items(work_items, cache)):
+                if row["id"]:
+                    rows.append(row)
+                else:
+                    logging.warning(f"Work Item com campos ausentes ou inválidos: {row}")
+
+        try:
+            if mode == "async":
+                # Importação tardia: extract_async depende deste módulo
+                from etl.scripts.extract_async import extract_work_items_async
+                asyncio.run(extract_work_items_async(work_item_ids, on_batch=collect, failed=failed))
+            elif mode == "batch":
+                collect(iter_work_items_batch(work_item_ids, failed=failed))
+            else:
+                collect(iter_work_items(work_item_ids, failed=failed))
+            if cached_ids:
+                rows.extend(cache.rows(cached_ids))
+        finally:
+            if cache is not None:
+                cache.commit()
+
+        if not rows:
             logging.warning("Nenhum dado extraído. Nenhum Work Item processado.")
-            return
+            return None, None
+
+        df = frame_from_records(rows, RAW_SCHEMA)
+        watermark = None if hold_watermark(failed) else candidate_watermark(df["System.ChangedDate"].dropna())
+        get_journal().finish_run()
+        logging.info(f"{len(df)} Work Items extraídos em memória. Conexões HTTP: {get_client().stats}")
+        return df, watermark
+    except RetryError as re:
+        logging.error("Erro persistente ao tentar acessar a API: %s", re)
+    except Exception as e:
+        logging.error("Erro inesperado na extração: %s", e)
+    return None, None
+
+# Função para execução da extração
+def run_extract(output_path, mode=None, full_refresh=False, streaming=None):
+    """
+    Extrai os Work Items para `output_path`. Retorna o watermark candidato (maior
+    System.ChangedDate extraído), que o chamador grava com save_watermark depois da
+    carga; None se nada foi extraído, se algum lote falhou ou em caso de erro.
+    """
+    mode = mode or EXTRACT_MODE
+    streaming = STREAMING if streaming is None else streaming
+    if mode == "async" and not streaming:
+        # Importação tardia: extract_async depende deste módulo
+        from etl.scripts.extract_async import run_extract_async
+        return run_extract_async(output_path, full_refresh=full_refresh)
+    try:
+        logging.info(f"Iniciando extração dos Work Items (modo {mode})...")
+        # Só o modo streaming retoma: nos demais os itens extraídos ficam em memória até o fim
+        get_journal().start_run(output_path, resume=streaming)
+        since = resolve_since(full_refresh)
+        work_item_ids = extract_work_item_ids(since)
+        if not work_item_ids:
+            logging.warning("Nenhum ID de Work Item encontrado. Processo finalizado.")
+            return None
+
+        # Na extração incremental quase todos os IDs mudaram; a comparação de revisões só
+        # compensa na completa. O cache é alimentado em ambas.
+        cache = get_cache()
+        cached_ids = []
+        if cache is not None and since is None:
+            work_item_ids, cached_ids = split_by_revision(work_item_ids, cache)
+
+        failed = []
+        try:
+            if streaming:
+                if not run_extract_streaming(work_item_ids, output_path, mode, cached_ids, cache, failed):
+                    logging.warning("Nenhum dado extraído. Nenhum Work Item processado.")
+                    return None
+            else:
+                if mode == "batch":
+                    work_items = list(cache_work_items(iter_work_items_batch(work_item_ids, failed=failed), cache))
+                else:
+                    work_items = list(cache_work_items(iter_work_items(work_item_ids, failed=failed), cache))
+                if not work_items and not cached_ids:
+                    logging.warning("Nenhum dado extraído. Nenhum Work Item processado.")
+                    return None
+
+                logging.info(f"Salvando {len(work_items) + len(cached_ids)} Work Items no arquivo CSV.")
+                transform_and_save_to_csv(work_items, output_path, cache.rows(cached_ids) if cached_ids else ())
+        finally:
+            if cache is not None:
+                cache.commit()
+
+        watermark = None if hold_watermark(failed) else watermark_from_csv(output_path)
+        get_journal().finish_run()
+        logging.info(f"Conexões HTTP: {get_client().stats}")
 
-        logging.info(f"Salvando {len(work_items)} Work Items no arquivo CSV.")
-        transform_and_save_to_csv(work_items, output_path)
-        
         # Verificar se o arquivo foi realmente gerado
         if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
             logging.info(f"Arquivo de saída gerado com sucesso: {output_path}")
         else:
             logging.warning("Arquivo de saída não gerado ou vazio após a extração.")
+        return watermark
     except RetryError as re:
         logging.error("Erro persistente ao tentar acessar a API: %s", re)
     except Exception as e:
         logging.error("Erro inesperado na extração: %s", e)
-
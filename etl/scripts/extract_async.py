@@ -0,0 +1,165 @@
+import os
+import time
+import asyncio
+import logging
+
+import aiohttp
+
+from etl.scripts.extract import (
+    BATCH_SIZE, FIELDS, pat, wit_url, get_client,
+    extract_work_item_ids, get_journal, hold_watermark, record_failed, resolve_since,
+    transform_and_save_to_csv, watermark_from_items,
+)
+from etl.utils.http_client import create_async_session
+
+# Quantidade máxima de requisições simultâneas
+CONCURRENCY = int(os.getenv('ETL_CONCURRENCY', 8))
+# Taxa sustentada de requisições por segundo compartilhada entre todos os workers
+RATE_LIMIT = float(os.getenv('ETL_RATE_LIMIT', 20))
+MAX_ATTEMPTS = 5
+RETRY_WAIT = 2
+
+
+class TokenBucket:
+    """
+    Token bucket compartilhado pelos workers.
+
+    Um 429 com Retry-After pausa o bucket inteiro: todas as requisições seguintes
+    aguardam o fim da pausa em vez de cada worker dormir por conta própria.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def fetch_async(session, bucket, batch_ids):
+    """
+    Busca um lote de Work Items (ou um único item, se batch_ids tiver um ID) respeitando o bucket.
+    """
+    if len(batch_ids) == 1:
+        method, url, payload = "GET", wit_url(f"workitems/{batch_ids[0]}?api-version=6.0&fields={','.join(FIELDS)}"), None
+    else:
+        method, url, payload = "POST", wit_url("workitemsbatch?api-version=6.0"), {
+            "ids": batch_ids, "fields": FIELDS, "errorPolicy": "omit"}
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        await bucket.acquire()
+        try:
+            async with session.request(method, url, json=payload) as response:
+                if response.status == 429:  # Too Many Requests
+                    retry_after = int(response.headers.get("Retry-After", 5))
+                    logging.warning(f"Limite de requisições atingido. Pausando todos os workers por {retry_after} segundos.")
+                    bucket.pause(retry_after)
+                    continue
+                response.raise_for_status()
+                data = await response.json()
+                if method == "GET":
+                    return [data]
+                return [item for item in data.get('value', []) if item]
+        except aiohttp.ClientResponseError as e:
+            # Só 5xx é transitório; os demais 4xx (400, 401, 404...) falham na primeira tentativa
+            if e.status < 500 or attempt == MAX_ATTEMPTS:
+                raise
+            logging.warning(f"Falha na tentativa {attempt} para o Work Item {batch_ids[0]}: {e}")
+            await asyncio.sleep(RETRY_WAIT)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == MAX_ATTEMPTS:
+                raise
+            logging.warning(f"Falha na tentativa {attempt} para o Work Item {batch_ids[0]}: {e}")
+            await asyncio.sleep(RETRY_WAIT)
+    raise RuntimeError(f"Limite de tentativas excedido para o Work Item {batch_ids[0]}.")
+
+
+async def extract_work_items_async(work_item_ids, concurrency=CONCURRENCY, batch_size=BATCH_SIZE,
+                                   rate_limit=RATE_LIMIT, on_batch=None, failed=None):
+    """
+    Extrai os Work Items com até `concurrency` requisições em andamento.
+    O resultado mantém a ordem de work_item_ids, como nos extratores síncronos.
+
+    Com `on_batch`, cada lote é entregue ao callback assim que chega (na ordem de
+    conclusão) e não é acumulado; nesse caso a função retorna uma lista vazia.
+    Os IDs dos lotes com erro vão para `failed`.
+    """
+    batches = [work_item_ids[i:i + batch_size] for i in range(0, len(work_item_ids), batch_size)]
+    results = [None] * len(batches)
+    queue = asyncio.Queue()
+    for index in range(len(batches)):
+        queue.put_nowait(index)
+
+    bucket = TokenBucket(rate_limit, capacity=concurrency)
+
+    async def worker(session):
+        while True:
+            try:
+                index = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            batch_ids = batches[index]
+            try:
+                batch = await fetch_async(session, bucket, batch_ids)
+                logging.info(f"Lote {index + 1}/{len(batches)} extraído ({len(batch)} Work Items).")
+                if on_batch:
+                    on_batch(batch)
+                else:
+                    results[index] = batch
+            except Exception as e:
+                logging.error(f"Erro ao processar lote iniciado no Work Item {batch_ids[0]}: {e}")
+                record_failed(failed, batch_ids)
+
+    async with create_async_session(pat, stats=get_client().stats, limit_per_host=concurrency) as session:
+        await asyncio.gather(*(worker(session) for _ in range(min(concurrency, len(batches)))))
+
+    return [item for batch in results if batch for item in batch]
+
+
+def run_extract_async(output_path, concurrency=None, full_refresh=False):
+    """
+    Equivalente assíncrono de run_extract: mesmo CSV, mesmo checkpoint e mesmo retorno
+    (watermark candidato, ou None).
+    """
+    concurrency = concurrency or CONCURRENCY
+    try:
+        logging.info(f"Iniciando extração assíncrona dos Work Items ({concurrency} requisições simultâneas)...")
+        get_journal().start_run(output_path, resume=False)
+        work_item_ids = extract_work_item_ids(resolve_since(full_refresh))
+        if not work_item_ids:
+            logging.warning("Nenhum ID de Work Item encontrado. Processo finalizado.")
+            return None
+
+        failed = []
+        work_items = asyncio.run(extract_work_items_async(work_item_ids, concurrency=concurrency, failed=failed))
+        if not work_items:
+            logging.warning("Nenhum dado extraído. Nenhum Work Item processado.")
+            return None
+
+        logging.info(f"Salvando {len(work_items)} Work Items no arquivo CSV.")
+        transform_and_save_to_csv(work_items, output_path)
+        watermark = None if hold_watermark(failed) else watermark_from_items(work_items)
+        get_journal().finish_run()
+        logging.info(f"Conexões HTTP: {get_client().stats}")
+        return watermark
+    except Exception as e:
+        logging.error("Erro inesperado na extração assíncrona: %s", e)
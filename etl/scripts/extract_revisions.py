@@ -0,0 +1,92 @@
+import csv
+import logging
+from urllib.parse import quote
+
+from tenacity import retry, stop_after_attempt, wait_fixed, RetryError
+
+from etl.scripts.extract import get_client, get_journal, handle_rate_limiting, wit_url
+
+# Campos de cada revisão usados para reconstruir as transições de estado
+REVISION_FIELDS = ["System.Id", "System.Rev", "System.State", "System.ChangedDate"]
+REVISION_COLUMNS = ["id", "rev", "System.State", "System.ChangedDate"]
+# Chave do continuation token no checkpoint de extração
+TOKEN_KEY = "revisions_token"
+
+
+@retry(stop=stop_after_attempt(5), wait=wait_fixed(2))
+def fetch_revisions_page(continuation_token=None):
+    """
+    Busca uma página da API de revisões (reporting/workitemrevisions).
+    """
+    url = (f"reporting/workitemrevisions?api-version=6.0&includeLatestOnly=false"
+           f"&fields={','.join(REVISION_FIELDS)}")
+    if continuation_token:
+        url += f"&continuationToken={quote(continuation_token)}"
+
+    response = get_client().get(wit_url(url))
+    if handle_rate_limiting(response):
+        return fetch_revisions_page(continuation_token)
+    response.raise_for_status()
+    return response.json()
+
+
+def iter_revisions(continuation_token=None):
+    """
+    Percorre as revisões feitas depois de `continuation_token` (todas, se None).
+    Gera (revisões da página, token ao final da página).
+    """
+    while True:
+        page = fetch_revisions_page(continuation_token)
+        continuation_token = page.get("continuationToken", continuation_token)
+        yield page.get("values", []), continuation_token
+        if page.get("isLastBatch", True):
+            return
+
+
+def load_revisions_token():
+    return get_journal().get(TOKEN_KEY)
+
+
+def save_revisions_token(continuation_token):
+    """
+    Persiste o token; deve ser chamado só depois que as revisões foram carregadas no banco.
+    """
+    if continuation_token:
+        get_journal().set(TOKEN_KEY, continuation_token)
+        logging.info("Continuation token de revisões atualizado.")
+
+
+def run_extract_revisions(output_path):
+    """
+    Grava em CSV as revisões feitas desde a última execução e retorna o novo
+    continuation token (ou None em caso de falha). O token não é persistido aqui:
+    run_etl o salva após a carga, para que uma falha no load não perca revisões.
+    """
+    continuation_token = load_revisions_token()
+    if continuation_token:
+        logging.info("Extraindo revisões desde a última execução...")
+    else:
+        logging.info("Nenhum continuation token registrado. Extraindo todo o histórico de revisões...")
+
+    total = 0
+    try:
+        with open(output_path, 'w', newline='', encoding='utf-8') as output_file:
+            writer = csv.DictWriter(output_file, fieldnames=REVISION_COLUMNS)
+            writer.writeheader()
+            for revisions, continuation_token in iter_revisions(continuation_token):
+                for revision in revisions:
+                    fields = revision.get("fields", {})
+                    writer.writerow({
+                        "id": revision.get("id", fields.get("System.Id")),
+                        "rev": revision.get("rev", fields.get("System.Rev")),
+                        "System.State": fields.get("System.State", ""),
+                        "System.ChangedDate": fields.get("System.ChangedDate", ""),
+                    })
+                total += len(revisions)
+        logging.info(f"{total} revisões salvas em {output_path}.")
+        return continuation_token
+    except RetryError as re:
+        logging.error("Erro persistente ao tentar acessar a API de revisões: %s", re)
+    except Exception as e:
+        logging.error("Erro inesperado na extração de revisões: %s", e)
+    return None
@@ -1,7 +1,10 @@
+import json
 import logging
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime
 from django.db import transaction
+from django.db.models import OuterRef, Subquery
 import os
 import sys
 
@@ -23,6 +26,10 @@ logging.info("Django configurado com sucesso!")
 
 # Importações que dependem do Django
 from dashboard.models import WorkItem, WorkItemHistory
+from dashboard.signals import bulk_ingest, dirty_buckets, mark_dirty
+from etl.utils.classifier import classify_work_items
+from etl.utils.date_utils import parse_processed_dates, to_python_dates
+from etl.utils.storage import PROCESSED_SCHEMA, artifact_path, iter_frames, read_frame
 logging.info("Modelos importados com sucesso!")
 
 
@@ -33,98 +40,386 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 # Diretório dos arquivos processados
 PROCESSED_DIR = "etl/data/processed/"
 
-def load_data_to_db(file_path):
+# Tamanho dos lotes de inserção no histórico
+HISTORY_BATCH_SIZE = int(os.getenv('ETL_HISTORY_BATCH_SIZE', 1000))
+# Quantidade de Work Items por INSERT ... ON CONFLICT
+LOAD_CHUNK_SIZE = int(os.getenv('ETL_LOAD_CHUNK_SIZE', 1000))
+# No PostgreSQL, carrega via COPY + tabela de staging (ver load_copy.py)
+LOAD_COPY = os.getenv('ETL_LOAD_COPY', 'True') == 'True'
+# Campos sobrescritos quando o Work Item já existe (resolved_date, lead_time e archived são preservados)
+UPSERT_FIELDS = ["title", "type", "state", "created_date", "changed_date", "assigned_to"]
+# Tamanho máximo das colunas de texto; linhas maiores vão para o arquivo de rejeitos
+MAX_LENGTHS = {"title": 255, "state": 50, "assigned_to": 255}
+
+# Carga em streaming: lê e confirma o arquivo em blocos, retomando do último bloco confirmado
+LOAD_STREAMING = os.getenv('ETL_LOAD_STREAMING', 'True') == 'True'
+LOAD_STREAM_CHUNK_ROWS = int(os.getenv('ETL_LOAD_STREAM_CHUNK_ROWS', 50000))
+LOAD_PROGRESS_FILE = "etl/checkpoints/load_progress.json"
+# Revisões de Work Items que ainda não estavam no banco, reprocessadas na próxima carga
+PENDING_REVISIONS_FILE = "etl/checkpoints/pending_revisions.csv"
+
+def load_data_to_db(file_path, record_history=True, streaming=None):
     """
-    Carrega os dados processados do CSV para as models Django.
+    Carrega os dados processados (CSV ou Parquet) para as models Django.
+    Com record_history=False não grava o snapshot em WorkItemHistory
+    (o histórico vem das revisões, ver load_revisions_to_history).
+    No modo streaming o arquivo é lido e confirmado em blocos (ver load_file_chunked).
+    Retorna a quantidade de Work Items carregados, ou None se a carga falhou.
     """
+    streaming = LOAD_STREAMING if streaming is None else streaming
     try:
-        # Ler o arquivo processado
-        df = pd.read_csv(file_path)
-        logging.info(f"Arquivo processado carregado de {file_path}.")
-        
-        # Verificar se as colunas esperadas estão presentes
-        expected_columns = ["id", "System.Title", "System.State", "System.CreatedDate", "System.ChangedDate", "System.AssignedTo"]
-        missing_columns = [col for col in expected_columns if col not in df.columns]
-        if missing_columns:
-            logging.error(f"Colunas ausentes no arquivo: {missing_columns}. Carregamento abortado.")
-            return
-        
-        # Carregar os dados no banco de dados
-        with transaction.atomic():
-            for _, row in df.iterrows():
-                # Verificar se o WorkItem já existe
-                work_item, created = WorkItem.objects.update_or_create(
-                    external_id=row["id"],
-                    defaults={
-                        "title": row["System.Title"],
-                        "type": infer_work_item_type(row["System.Title"]),
-                        "state": row["System.State"],
-                        "created_date": parse_date(row["System.CreatedDate"]),
-                        "changed_date": parse_date(row["System.ChangedDate"]),
-                        "assigned_to": row["System.AssignedTo"] if pd.notna(row["System.AssignedTo"]) else None,
-                    },
-                )
-                
-                if created:
-                    logging.info(f"Novo WorkItem criado: {work_item}")
-                else:
-                    logging.info(f"WorkItem atualizado: {work_item}")
-                
-                # Adicionar histórico
-                WorkItemHistory.objects.create(
-                    work_item=work_item,
-                    state=row["System.State"],
-                    changed_date=parse_date(row["System.ChangedDate"]),
-                )
-                logging.info(f"Histórico atualizado para WorkItem {work_item.external_id}.")
+        # Resumos e lead times são recalculados uma vez, ao fim da carga
+        with bulk_ingest():
+            if streaming:
+                return load_file_chunked(file_path, record_history=record_history)
+            # Ler o arquivo processado
+            df = read_frame(file_path, PROCESSED_SCHEMA)
+            logging.info(f"Arquivo processado carregado de {file_path}.")
+            return load_frame(df, record_history=record_history, reject_path=reject_path_for(file_path))
     except Exception as e:
         logging.error(f"Erro ao carregar dados para o banco de dados: {e}")
+        return None
+
+
+def reject_path_for(file_path):
+    return os.path.splitext(file_path)[0] + "_rejects.csv"
+
+
+def write_rejects(rows, error, reject_path):
+    """
+    Acrescenta linhas rejeitadas (com o motivo) ao arquivo de rejeitos.
+    """
+    if rows.empty:
+        return
+    if not reject_path:
+        logging.warning(f"{len(rows)} linhas rejeitadas ({error}): {rows['id'].tolist()}")
+        return
+    rows = rows.assign(error=error)
+    rows.to_csv(reject_path, mode='a', index=False, header=not os.path.exists(reject_path))
+    logging.warning(f"{len(rows)} linhas rejeitadas ({error}) gravadas em {reject_path}.")
+
+
+def prepare_work_items(df):
+    """
+    Monta as colunas de WorkItem a partir do DataFrame processado.
+    Retorna (colunas válidas, máscara das linhas inválidas de `df`).
+    """
+    columns = pd.DataFrame({
+        "external_id": df["id"],
+        "title": df["System.Title"],
+        "state": df["System.State"],
+        "created_date": to_python_dates(parse_processed_dates(df["System.CreatedDate"])),
+        "changed_date": to_python_dates(parse_processed_dates(df["System.ChangedDate"])),
+        "assigned_to": df["System.AssignedTo"].astype(object).where(df["System.AssignedTo"].notna(), None),
+    })
+
+    # Campos obrigatórios ausentes ou maiores que as colunas do banco
+    invalid = columns[["external_id", "title", "state", "created_date", "changed_date"]].isna().any(axis=1)
+    for name, max_length in MAX_LENGTHS.items():
+        invalid |= columns[name].astype("string").str.len().fillna(0).gt(max_length).to_numpy()
+
+    columns = columns[~invalid].astype({"external_id": "int64"})
+    # Arquivos processados antigos não têm System.WorkItemType: classificação só pelo título
+    work_item_types = df["System.WorkItemType"][~invalid] if "System.WorkItemType" in df.columns else None
+    columns["type"] = classify_work_items(columns["title"], work_item_types)
+    columns["content_hash"] = content_hashes(columns)
+    return columns, invalid
+
+
+def content_hashes(columns):
+    """
+    Hash (int64) de cada linha sobre os campos gravados, calculado de uma vez.
+    """
+    hashes = pd.util.hash_pandas_object(columns[UPSERT_FIELDS], index=False)
+    return hashes.to_numpy().view(np.int64)
+
+
+def write_work_items(columns, record_history=True, use_copy=None):
+    """
+    Grava as colunas preparadas: COPY no PostgreSQL, upsert em lotes nos demais bancos.
+    Retorna a quantidade de Work Items novos ou alterados.
+    """
+    use_copy = LOAD_COPY if use_copy is None else use_copy
+    if use_copy:
+        # Importação tardia: o caminho COPY só é usado no PostgreSQL
+        from etl.scripts.load_copy import copy_available, copy_work_items
+        if copy_available():
+            return copy_work_items(columns, record_history=record_history)
+
+    written = 0
+    with transaction.atomic():
+        for start in range(0, len(columns), LOAD_CHUNK_SIZE):
+            written += upsert_work_items(columns.iloc[start:start + LOAD_CHUNK_SIZE], record_history)
+    return written
+
+
+def load_frame(df, record_history=True, reject_path=None):
+    """
+    Carrega um DataFrame processado (saída de transform_frame) para as models Django,
+    em uma transação. Linhas inválidas vão para `reject_path`. Retorna a quantidade de
+    Work Items gravados (None se faltarem colunas).
+    """
+    # Verificar se as colunas esperadas estão presentes
+    expected_columns = ["id", "System.Title", "System.State", "System.CreatedDate", "System.ChangedDate", "System.AssignedTo"]
+    missing_columns = [col for col in expected_columns if col not in df.columns]
+    if missing_columns:
+        logging.error(f"Colunas ausentes no arquivo: {missing_columns}. Carregamento abortado.")
+        return None
+
+    # Upsert em lote: linhas repetidas do mesmo item não podem cair no mesmo INSERT ... ON CONFLICT
+    df = df.drop_duplicates(subset="id", keep="last")
+    columns, invalid = prepare_work_items(df)
+
+    # Carregar os dados no banco de dados
+    written = write_work_items(columns, record_history)
+    # Rejeitos só depois da gravação, para não duplicá-los se o bloco for refeito linha a linha
+    write_rejects(df[invalid], "campos obrigatórios ausentes ou valores longos demais", reject_path)
+    logging.info(f"{len(columns)} Work Items carregados: {written} novos ou alterados, "
+                 f"{len(columns) - written} sem mudança.")
+    return len(columns)
+
+
+def load_rows_individually(df, record_history, reject_path):
+    """
+    Recarrega um bloco que falhou linha a linha, cada uma em sua própria transação;
+    as linhas que o banco recusar vão para o arquivo de rejeitos.
+    """
+    df = df.drop_duplicates(subset="id", keep="last")
+    columns, invalid = prepare_work_items(df)
+    write_rejects(df[invalid], "campos obrigatórios ausentes ou valores longos demais", reject_path)
+
+    loaded = 0
+    for index in columns.index:
+        try:
+            with transaction.atomic():
+                upsert_work_items(columns.loc[[index]], record_history)
+            loaded += 1
+        except Exception as e:
+            write_rejects(df.loc[[index]], str(e), reject_path)
+    return loaded
 
 
-def parse_date(date_str):
+def load_progress(file_path):
+    """
+    Retorna o índice do último bloco confirmado de `file_path` (-1 se nenhum) e os
+    buckets (tipo, mês de resolução) que os blocos confirmados deixaram por recalcular.
+    O progresso só vale para o mesmo arquivo (caminho, tamanho e data de modificação).
+    """
+    if not os.path.exists(LOAD_PROGRESS_FILE):
+        return -1, set()
     try:
-        return datetime.strptime(date_str, "%d/%m/%Y").date()
-    except ValueError:
+        with open(LOAD_PROGRESS_FILE, 'r') as f:
+            progress = json.load(f)
+    except Exception as e:
+        logging.warning(f"Erro ao carregar o progresso da carga: {e}")
+        return -1, set()
+    if progress.get("file") != file_signature(file_path):
+        return -1, set()
+    buckets = {(work_type, date.fromisoformat(month)) for work_type, month in progress.get("dirty", [])}
+    return progress.get("chunk", -1), buckets
+
+
+def save_progress(file_path, chunk_index, buckets=()):
+    tmp_path = LOAD_PROGRESS_FILE + ".tmp"
+    dirty = sorted([work_type, month.isoformat()] for work_type, month in buckets)
+    with open(tmp_path, 'w') as f:
+        json.dump({"file": file_signature(file_path), "chunk": chunk_index, "dirty": dirty}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, LOAD_PROGRESS_FILE)
+
+
+def file_signature(file_path):
+    stat = os.stat(file_path)
+    return f"{os.path.abspath(file_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def load_file_chunked(file_path, record_history=True, chunk_size=None):
+    """
+    Lê o arquivo processado em blocos e confirma cada bloco em sua própria transação,
+    registrando o progresso em LOAD_PROGRESS_FILE. Uma nova execução sobre o mesmo
+    arquivo continua a partir do bloco seguinte ao último confirmado. O progresso guarda
+    também os buckets a recalcular: se o processo cair, a retomada os recalcula ao fim.
+    """
+    chunk_size = chunk_size or LOAD_STREAM_CHUNK_ROWS
+    reject_path = reject_path_for(file_path)
+    os.makedirs(os.path.dirname(LOAD_PROGRESS_FILE) or ".", exist_ok=True)
+    last_chunk, buckets = load_progress(file_path)
+    if last_chunk >= 0:
+        logging.info(f"Retomando a carga de {file_path} após o bloco {last_chunk}.")
+    for work_type, resolved_month in buckets:
+        mark_dirty(work_type, resolved_month)
+
+    loaded = 0
+    for index, df in enumerate(iter_frames(file_path, PROCESSED_SCHEMA, chunksize=chunk_size)):
+        if index <= last_chunk:
+            continue
         try:
-            return datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError as e:
-            logging.error(f"Erro ao converter data {date_str}: {e}")
-            return None
+            count = load_frame(df, record_history=record_history, reject_path=reject_path)
+            if count is None:
+                return None
+            loaded += count
+        except Exception as e:
+            logging.warning(f"Falha ao carregar o bloco {index}: {e}. Carregando linha a linha...")
+            loaded += load_rows_individually(df, record_history, reject_path)
+        save_progress(file_path, index, dirty_buckets())
+        logging.info(f"Bloco {index} confirmado ({loaded} Work Items carregados até agora).")
 
+    # Carga completa: a próxima execução sobre este arquivo começa do início
+    if os.path.exists(LOAD_PROGRESS_FILE):
+        os.remove(LOAD_PROGRESS_FILE)
+    logging.info(f"{loaded} Work Items carregados de {file_path}.")
+    return loaded
 
 
-def infer_work_item_type(title):
+def upsert_work_items(chunk, record_history=True):
     """
-    Infere o tipo do WorkItem com base no título.
+    Insere ou atualiza um lote de Work Items com um único INSERT ... ON CONFLICT.
+    Só entram no INSERT os itens novos ou com content_hash diferente do gravado, e nunca
+    uma versão com changed_date anterior à gravada (ex.: backfill de arquivos antigos);
+    se pedido, grava histórico apenas dos itens novos ou cujo estado mudou.
+    Sinais de save do WorkItem não são disparados. Retorna a quantidade de itens gravados.
     """
-    if "Bug" in title:
-        return "Bug"
-    elif "Task" in title:
-        return "Task"
-    elif "User Story" in title:
-        return "UserStory"
-    return "Task"  # Tipo padrão
+    # Hash e estado gravados de todo o lote em uma consulta
+    stored = pd.DataFrame(
+        list(WorkItem.objects.filter(external_id__in=chunk["external_id"].tolist())
+             .values_list("external_id", "content_hash", "state", "type", "resolved_date", "changed_date")),
+        columns=["external_id", "stored_hash", "stored_state", "stored_type", "resolved_date", "stored_changed_date"],
+    ).astype({"external_id": "int64", "stored_hash": "Int64"})
+    chunk = chunk.merge(stored, on="external_id", how="left")
+    older = pd.to_datetime(chunk["changed_date"]).lt(pd.to_datetime(chunk["stored_changed_date"]))
+    changed = chunk[chunk["content_hash"].ne(chunk["stored_hash"]).fillna(True).astype(bool) & ~older]
+    if changed.empty:
+        return 0
 
+    # Buckets (tipo, mês de resolução) afetados: recalculados ao fim de bulk_ingest
+    for row in changed[changed["resolved_date"].notna()].itertuples(index=False):
+        mark_dirty(row.type, row.resolved_date)
+        mark_dirty(row.stored_type, row.resolved_date)
 
-def run_load(file_path=None):
+    rows = list(changed.itertuples(index=False))
+    WorkItem.objects.bulk_create(
+        [
+            WorkItem(
+                external_id=row.external_id,
+                title=row.title,
+                type=row.type,
+                state=row.state,
+                created_date=row.created_date,
+                changed_date=row.changed_date,
+                assigned_to=row.assigned_to,
+                content_hash=row.content_hash,
+            )
+            for row in rows
+        ],
+        update_conflicts=True,
+        unique_fields=["external_id"],
+        update_fields=UPSERT_FIELDS + ["content_hash", "updated_at"],
+    )
+
+    moved = changed[changed["state"].ne(changed["stored_state"]).fillna(True).astype(bool)]
+    if record_history and not moved.empty:
+        # Resolver external_id -> pk de todo o lote em uma consulta
+        pks = dict(WorkItem.objects.filter(external_id__in=moved["external_id"].tolist())
+                   .values_list("external_id", "pk"))
+        WorkItemHistory.objects.bulk_create(
+            [
+                WorkItemHistory(work_item_id=pks[row.external_id], state=row.state, changed_date=row.changed_date)
+                for row in moved.itertuples(index=False)
+            ],
+            batch_size=HISTORY_BATCH_SIZE,
+        )
+    return len(changed)
+
+
+def load_revisions_to_history(file_path):
     """
-    Executa o processo de carregamento.
+    Insere em WorkItemHistory as transições de estado reais a partir do CSV de revisões.
+
+    Uma revisão só gera histórico quando o estado difere da revisão anterior do mesmo
+    item; para a primeira revisão do arquivo, compara com o último estado já registrado.
+
+    Revisões de itens que ainda não estão no banco ficam em PENDING_REVISIONS_FILE e
+    entram de novo na próxima carga, já que o continuation token avança além delas.
+    """
+    try:
+        df = pd.read_csv(file_path)
+        if os.path.exists(PENDING_REVISIONS_FILE):
+            df = pd.concat([pd.read_csv(PENDING_REVISIONS_FILE), df]).drop_duplicates(subset=["id", "rev"])
+        if df.empty:
+            logging.info("Nenhuma revisão nova para carregar no histórico.")
+            return 0
+
+        df = df.dropna(subset=["id", "System.State"]).sort_values(["id", "rev"])
+        df["changed_date"] = pd.to_datetime(df["System.ChangedDate"], utc=True, format="ISO8601").dt.date
+
+        # Mapear external_id -> (pk, último estado registrado) em uma única consulta
+        last_state = WorkItemHistory.objects.filter(work_item=OuterRef("pk")).order_by("-changed_date", "-id")
+        work_items = WorkItem.objects.filter(external_id__in=df["id"].unique().tolist()).annotate(
+            last_state=Subquery(last_state.values("state")[:1])
+        ).values_list("external_id", "pk", "last_state")
+        known = pd.DataFrame(list(work_items), columns=["id", "work_item_id", "last_state"])
+
+        unmatched = df[~df["id"].isin(known["id"])]
+        df = df.merge(known, on="id", how="inner")
+        previous = df.groupby("id")["System.State"].shift()
+        previous = previous.fillna(df["last_state"])
+        transitions = df[df["System.State"] != previous]
+
+        history = [
+            WorkItemHistory(work_item_id=row.work_item_id, state=row.state, changed_date=row.changed_date)
+            for row in transitions.rename(columns={"System.State": "state"}).itertuples(index=False)
+        ]
+        with transaction.atomic():
+            WorkItemHistory.objects.bulk_create(history, batch_size=HISTORY_BATCH_SIZE)
+        save_pending_revisions(unmatched)
+        logging.info(f"{len(history)} transições de estado inseridas em WorkItemHistory "
+                     f"a partir de {len(df)} revisões.")
+        return len(history)
+    except Exception as e:
+        logging.error(f"Erro ao carregar revisões no histórico: {e}")
+        return None
+
+
+def save_pending_revisions(unmatched):
+    """
+    Substitui o arquivo de revisões pendentes pelas revisões ainda sem Work Item no banco.
+    """
+    if unmatched.empty:
+        if os.path.exists(PENDING_REVISIONS_FILE):
+            os.remove(PENDING_REVISIONS_FILE)
+        return
+    os.makedirs(os.path.dirname(PENDING_REVISIONS_FILE) or ".", exist_ok=True)
+    tmp_path = PENDING_REVISIONS_FILE + ".tmp"
+    unmatched[["id", "rev", "System.State", "System.ChangedDate"]].to_csv(tmp_path, index=False)
+    os.replace(tmp_path, PENDING_REVISIONS_FILE)
+    logging.info(f"{len(unmatched)} revisões de Work Items ainda não carregados ficam pendentes "
+                 f"para a próxima execução.")
+
+
+def run_load(file_path=None, record_history=True):
+    """
+    Executa o processo de carregamento. Retorna o resultado de load_data_to_db
+    (quantidade de Work Items carregados) ou None se a carga não aconteceu ou falhou.
     """
     try:
         if not file_path:
             # Caminho do arquivo processado mais recente
             today = datetime.now().strftime("%Y-%m-%d")
-            file_path = os.path.join(PROCESSED_DIR, f"work_items_transformed_{today}.csv")
+            file_path = artifact_path(PROCESSED_DIR, f"work_items_transformed_{today}")
         
         if not os.path.exists(file_path):
             logging.warning(f"Arquivo processado não encontrado: {file_path}")
-            return
+            return None
         
         # Carregar os dados no banco
-        load_data_to_db(file_path)
-        logging.info("Processo de carregamento concluído com sucesso.")
+        loaded = load_data_to_db(file_path, record_history=record_history)
+        if loaded is not None:
+            logging.info("Processo de carregamento concluído com sucesso.")
+        return loaded
     except Exception as e:
         logging.error(f"Erro durante o processo de carregamento: {e}")
+        return None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+import io
+import os
+import logging
+
+from django.db import connection, transaction
+
+from dashboard.models import WorkItem, WorkItemHistory
+from dashboard.signals import mark_dirty
+
+# Tabela de staging (UNLOGGED: sem WAL, descartável) e tamanho de cada bloco do COPY
+STAGING_TABLE = "etl_workitem_staging"
+COPY_CHUNK_SIZE = int(os.getenv('ETL_COPY_CHUNK_SIZE', 100000))
+
+STAGING_COLUMNS = ["external_id", "title", "type", "state", "created_date", "changed_date", "assigned_to",
+                   "content_hash"]
+
+
+def copy_available():
+    return connection.vendor == "postgresql"
+
+
+def _copy_csv(cursor, table, columns, buffer):
+    """
+    Envia `buffer` (CSV) com COPY FROM STDIN, no driver em uso (psycopg2 ou psycopg 3).
+    """
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    raw_cursor = cursor.cursor
+    if hasattr(raw_cursor, "copy_expert"):
+        raw_cursor.copy_expert(sql, buffer)
+    else:
+        with raw_cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def copy_work_items(columns, record_history=True):
+    """
+    Carrega os Work Items via COPY para a tabela de staging e mescla com SQL em conjunto:
+    um INSERT ... ON CONFLICT DO UPDATE em WorkItem (só para content_hash diferente) e
+    um INSERT ... SELECT no histórico (só itens novos ou com mudança de estado). Versões
+    com changed_date anterior à gravada são descartadas, como em upsert_work_items.
+    Retorna a quantidade de Work Items novos ou alterados.
+
+    `columns` é o DataFrame montado em load_frame (uma linha por external_id, com `type`).
+    """
+    work_item_table = WorkItem._meta.db_table
+    history_table = WorkItemHistory._meta.db_table
+    updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in STAGING_COLUMNS + ["updated_at"]
+                        if name != "external_id")
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Recriada a cada carga (as colunas acompanham o código); o DROP bloqueia a tabela
+        # até o fim da transação, então cargas simultâneas são serializadas
+        cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        cursor.execute(f"""
+            CREATE UNLOGGED TABLE {STAGING_TABLE} (
+                external_id integer NOT NULL,
+                title varchar(255),
+                type varchar(50),
+                state varchar(50),
+                created_date date,
+                changed_date date,
+                assigned_to varchar(255),
+                content_hash bigint,
+                state_changed boolean NOT NULL DEFAULT true
+            )
+        """)
+
+        for start in range(0, len(columns), COPY_CHUNK_SIZE):
+            buffer = io.StringIO()
+            columns.iloc[start:start + COPY_CHUNK_SIZE][STAGING_COLUMNS].to_csv(buffer, header=False, index=False)
+            buffer.seek(0)
+            _copy_csv(cursor, STAGING_TABLE, STAGING_COLUMNS, buffer)
+
+        # Versões mais antigas que a gravada (ex.: backfill) não sobrescrevem o Work Item
+        cursor.execute(f"""
+            DELETE FROM {STAGING_TABLE} s
+            USING {work_item_table} w
+            WHERE w.external_id = s.external_id AND s.changed_date < w.changed_date
+        """)
+
+        # Buckets (tipo, mês de resolução) afetados: recalculados ao fim de bulk_ingest
+        cursor.execute(f"""
+            SELECT DISTINCT w.type, s.type, w.resolved_date
+            FROM {STAGING_TABLE} s
+            JOIN {work_item_table} w ON w.external_id = s.external_id
+            WHERE w.resolved_date IS NOT NULL AND w.content_hash IS DISTINCT FROM s.content_hash
+        """)
+        for old_type, new_type, resolved_date in cursor.fetchall():
+            mark_dirty(old_type, resolved_date)
+            mark_dirty(new_type, resolved_date)
+
+        # Marcar, antes do merge, os itens existentes cujo estado não mudou
+        cursor.execute(f"""
+            UPDATE {STAGING_TABLE} s SET state_changed = false
+            FROM {work_item_table} w
+            WHERE w.external_id = s.external_id AND w.state = s.state
+        """)
+
+        cursor.execute(f"""
+            INSERT INTO {work_item_table} ({', '.join(STAGING_COLUMNS)}, archived, updated_at)
+            SELECT {', '.join(STAGING_COLUMNS)}, false, now() FROM {STAGING_TABLE}
+            ON CONFLICT (external_id) DO UPDATE SET {updates}
+            WHERE {work_item_table}.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+        """)
+        upserted = cursor.rowcount
+
+        history = 0
+        if record_history:
+            cursor.execute(f"""
+                INSERT INTO {history_table} (work_item_id, state, changed_date)
+                SELECT w.id, s.state, s.changed_date
+                FROM {STAGING_TABLE} s
+                JOIN {work_item_table} w ON w.external_id = s.external_id
+                WHERE s.state_changed
+            """)
+            history = cursor.rowcount
+
+        cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+
+    logging.info(f"COPY: {upserted} Work Items novos ou alterados e {history} registros de histórico inseridos.")
+    return upserted
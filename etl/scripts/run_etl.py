@@ -1,6 +1,7 @@
 import os
 import sys
 import logging
+import threading
 from datetime import datetime
 
 # Adicionar o diretório raiz ao PYTHONPATH
@@ -12,10 +13,16 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 import django
 django.setup()
 
+from dashboard.signals import bulk_ingest
+from dashboard.utils.materialized_views import refresh_materialized_views
 from etl.utils.logger import setup_logger
-from etl.scripts.extract import run_extract
-from etl.scripts.transform import run_transform
-from etl.scripts.load import run_load
+from etl.scripts.extract import extract_frame, run_extract, save_watermark
+from etl.scripts.transform import run_transform, transform_frame
+from etl.scripts.extract_revisions import run_extract_revisions, save_revisions_token
+from etl.scripts.load import load_frame, run_load, load_revisions_to_history
+from etl.utils.storage import (
+    RAW_SCHEMA, artifact_path, format_of, is_empty_artifact, read_frame, resolve_format, write_frame,
+)
 
 DATA_DIR = os.path.join(BASE_DIR, "etl/data/")
 RAW_DIR = os.path.join(DATA_DIR, "raw/")
@@ -26,45 +33,140 @@ os.makedirs(RAW_DIR, exist_ok=True)
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 os.makedirs(ARCHIVE_DIR, exist_ok=True)
 
-def archive_raw_file(file_path):
+# Histórico de estados a partir da API de revisões (em vez de um snapshot por execução)
+REVISION_HISTORY = os.getenv('ETL_REVISION_HISTORY', 'True') == 'True'
+# Modo fundido: extract -> transform -> load em memória, sem arquivos intermediários
+FUSED = os.getenv('ETL_FUSED', 'False') == 'True'
+# No modo fundido, grava o bruto no arquivo morto (em segundo plano)
+ARCHIVE_RAW = os.getenv('ETL_ARCHIVE_RAW', 'True') == 'True'
+
+def archive_raw_file(file_path, schema=None):
+    """
+    Move o arquivo bruto para o arquivo morto. Com o formato intermediário Parquet e um
+    `schema`, o CSV bruto é convertido (bem menor em disco) em vez de apenas movido.
+    """
     try:
         if os.path.exists(file_path):
             archive_path = os.path.join(ARCHIVE_DIR, os.path.basename(file_path))
-            os.rename(file_path, archive_path)
+            if schema and format_of(file_path) == "csv" and resolve_format() == "parquet":
+                archive_path = artifact_path(ARCHIVE_DIR, os.path.splitext(os.path.basename(file_path))[0])
+                write_frame(read_frame(file_path, schema), archive_path, schema)
+                os.remove(file_path)
+            else:
+                os.rename(file_path, archive_path)
             logging.info(f"Arquivo {file_path} movido para o diretório de arquivo: {archive_path}.")
         else:
             logging.warning(f"Arquivo {file_path} não encontrado para arquivamento.")
     except Exception as e:
         logging.error(f"Erro ao arquivar o arquivo {file_path}: {e}")
 
-def run_etl():
+def archive_raw_frame_async(df, today):
+    """
+    Grava o DataFrame bruto no arquivo morto em uma thread, em paralelo ao transform e load.
+    """
+    archive_path = artifact_path(ARCHIVE_DIR, f"work_items_raw_{today}")
+
+    def write():
+        try:
+            write_frame(df, archive_path, RAW_SCHEMA)
+            logging.info(f"Dados brutos arquivados em {archive_path}.")
+        except Exception as e:
+            logging.error(f"Erro ao arquivar os dados brutos em {archive_path}: {e}")
+
+    thread = threading.Thread(target=write, name="archive-raw")
+    thread.start()
+    return thread
+
+def run_fused(today, full_refresh=False):
+    """
+    Executa extract, transform e load em memória. Retorna False se o pipeline foi interrompido.
+    """
+    raw, watermark = extract_frame(full_refresh=full_refresh)
+    if raw is None or raw.empty:
+        logging.warning("Nenhum dado extraído. Interrompendo pipeline ETL.")
+        return False
+
+    archiver = archive_raw_frame_async(raw, today) if ARCHIVE_RAW else None
+    try:
+        # transform_frame não altera `raw`, que a thread de arquivamento ainda pode estar lendo
+        processed = transform_frame(raw)
+        if processed is None or processed.empty:
+            logging.warning("Nenhum dado transformado. Interrompendo pipeline ETL.")
+            return False
+        with bulk_ingest():
+            loaded = load_frame(processed, record_history=not REVISION_HISTORY)
+        if loaded is None:
+            logging.error("Carga falhou. Watermark mantido para a próxima execução.")
+            return False
+        # O watermark só avança depois que os Work Items foram gravados no banco
+        save_watermark(watermark)
+        logging.info("Processo de carregamento concluído com sucesso.")
+        return True
+    finally:
+        if archiver is not None:
+            archiver.join()
+
+def run_revision_history(today):
+    revisions_csv = os.path.join(RAW_DIR, f"work_item_revisions_{today}.csv")
+    continuation_token = run_extract_revisions(revisions_csv)
+    if continuation_token is None:
+        logging.warning("Revisões não extraídas. Histórico não atualizado nesta execução.")
+        return
+
+    # O token só avança depois que as transições foram gravadas no banco
+    if load_revisions_to_history(revisions_csv) is not None:
+        save_revisions_token(continuation_token)
+        archive_raw_file(revisions_csv)
+
+def run_etl(full_refresh=False, fused=None):
+    fused = FUSED if fused is None else fused
     try:
         logging.info("Iniciando pipeline ETL...")
         today = datetime.now().strftime("%Y-%m-%d")
+        if fused:
+            if run_fused(today, full_refresh=full_refresh):
+                if REVISION_HISTORY:
+                    run_revision_history(today)
+                refresh_materialized_views()
+                logging.info("Pipeline ETL concluído com sucesso.")
+            return
+
         raw_csv = os.path.join(RAW_DIR, f"work_items_raw_{today}.csv")
-        processed_csv = os.path.join(PROCESSED_DIR, f"work_items_transformed_{today}.csv")
+        # O bruto é sempre CSV (gravado em streaming e retomável); o processado segue ETL_INTERMEDIATE_FORMAT
+        processed_path = artifact_path(PROCESSED_DIR, f"work_items_transformed_{today}")
         
         # Extração
-        run_extract(output_path=raw_csv)
+        watermark = run_extract(output_path=raw_csv, full_refresh=full_refresh)
         if not os.path.exists(raw_csv) or os.path.getsize(raw_csv) == 0:
             logging.warning("Nenhum dado extraído. Interrompendo pipeline ETL.")
             return
         
         # Transformação
-        run_transform(input_path=raw_csv, output_path=processed_csv)
-        if not os.path.exists(processed_csv) or os.path.getsize(processed_csv) == 0:
+        run_transform(input_path=raw_csv, output_path=processed_path)
+        if is_empty_artifact(processed_path):
             logging.warning("Nenhum dado transformado. Interrompendo pipeline ETL.")
             return
 
-        # Carga
-        run_load(file_path=processed_csv)
+        # Carga; o watermark só avança depois que os Work Items foram gravados no banco
+        if run_load(file_path=processed_path, record_history=not REVISION_HISTORY) is None:
+            logging.error("Carga falhou. Watermark mantido e arquivo bruto preservado para a próxima execução.")
+            return
+        save_watermark(watermark)
+
+        # Histórico de estados
+        if REVISION_HISTORY:
+            run_revision_history(today)
         
+        # Agregados do dashboard (materialized views, só no PostgreSQL)
+        refresh_materialized_views()
+
         # Arquivamento
-        archive_raw_file(raw_csv)
+        archive_raw_file(raw_csv, RAW_SCHEMA)
         logging.info("Pipeline ETL concluído com sucesso.")
     except Exception as e:
         logging.error(f"Erro durante o pipeline ETL: {e}")
 
 if __name__ == "__main__":
     setup_logger(os.path.join(DATA_DIR, "logs/etl.log"))
-    run_etl()
+    # --full ignora o watermark e extrai todos os Work Items; --fused executa em memória
+    run_etl(full_refresh="--full" in sys.argv, fused=True if "--fused" in sys.argv else None)
@@ -1,9 +1,10 @@
-import pandas as pd
-from datetime import datetime
 import os
 import logging
 from dotenv import load_dotenv
 
+from etl.utils.date_utils import parse_api_dates
+from etl.utils.storage import PROCESSED_SCHEMA, RAW_SCHEMA, is_empty_artifact, read_frame, write_frame
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -16,18 +17,6 @@ PROCESSED_DIR = "data/processed/"
 os.makedirs(RAW_DIR, exist_ok=True)
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 
-# Função para converter datas para o formato BR (DD/MM/AAAA)
-def format_date_br(date_str):
-    try:
-        if "." in date_str:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S.%fZ")
-        else:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ")
-        return date_obj.strftime("%d/%m/%Y")
-    except ValueError as e:
-        logging.error(f"Erro ao formatar a data {date_str}: {e}")
-        return None
-
 # Função para validar as colunas obrigatórias
 def validate_columns(df, required_columns):
     missing_columns = [col for col in required_columns if col not in df.columns]
@@ -36,29 +25,45 @@ def validate_columns(df, required_columns):
         return False
     return True
 
-# Função para transformar e salvar o CSV
+def transform_frame(df):
+    """
+    Aplica as transformações a um DataFrame bruto e retorna um novo DataFrame
+    (None se faltarem colunas). O DataFrame recebido não é alterado.
+    """
+    # Verificar se as colunas esperadas estão presentes
+    required_columns = ["System.CreatedDate", "System.ChangedDate", "System.Title", "System.State"]
+    if not validate_columns(df, required_columns):
+        return None
+
+    # Uma extração retomada pode ter regravado itens; mantém a ocorrência mais recente
+    if "id" in df.columns:
+        df = df.drop_duplicates(subset="id", keep="last")
+    else:
+        df = df.copy()
+
+    # Converter os timestamps em datas de uma vez; o formato BR fica para a exibição
+    df["System.CreatedDate"] = parse_api_dates(df["System.CreatedDate"])
+    df["System.ChangedDate"] = parse_api_dates(df["System.ChangedDate"])
+
+    # Validar se há valores nulos
+    if df.isnull().values.any():
+        missing_data = df[df.isnull().any(axis=1)]
+        logging.warning(f"Existem valores nulos no arquivo transformado: {missing_data}")
+    return df
+
+# Função para transformar e salvar o arquivo processado (CSV ou Parquet)
 def transform_csv(input_path, output_path):
     try:
-        # Ler o CSV bruto
-        df = pd.read_csv(input_path)
+        # Ler o arquivo bruto com os tipos declarados (sem inferência)
+        df = read_frame(input_path, RAW_SCHEMA)
         logging.info(f"Arquivo bruto carregado de {input_path}.")
 
-        # Verificar se as colunas esperadas estão presentes
-        required_columns = ["System.CreatedDate", "System.ChangedDate", "System.Title", "System.State"]
-        if not validate_columns(df, required_columns):
+        df = transform_frame(df)
+        if df is None:
             return
 
-        # Transformar datas para o formato BR
-        df["System.CreatedDate"] = df["System.CreatedDate"].apply(format_date_br)
-        df["System.ChangedDate"] = df["System.ChangedDate"].apply(format_date_br)
-
-        # Validar se há valores nulos
-        if df.isnull().values.any():
-            missing_data = df[df.isnull().any(axis=1)]
-            logging.warning(f"Existem valores nulos no arquivo transformado: {missing_data}")
-
         # Salvar o arquivo transformado
-        df.to_csv(output_path, index=False)
+        write_frame(df, output_path, PROCESSED_SCHEMA)
         logging.info(f"Arquivo transformado salvo em {output_path}.")
     except Exception as e:
         logging.error(f"Erro ao transformar o arquivo: {e}")
@@ -69,7 +74,7 @@ def run_transform(input_path, output_path):
         logging.info(f"Iniciando transformação do arquivo {input_path}.")
         transform_csv(input_path, output_path)
         
-        if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        if is_empty_artifact(output_path):
             logging.warning(f"O arquivo transformado {output_path} está vazio ou não foi gerado. Transformação interrompida.")
             return
         
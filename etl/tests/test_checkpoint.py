@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from etl.utils.checkpoint import CheckpointJournal
+
+
+class CheckpointJournalTests(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "checkpoint.json")
+
+    def journal(self, **kwargs):
+        kwargs.setdefault("flush_items", 2)
+        kwargs.setdefault("flush_seconds", 3600)
+        kwargs.setdefault("compact_records", 100)
+        return CheckpointJournal(self.path, **kwargs)
+
+    def test_resume_replays_flushed_records(self):
+        journal = self.journal()
+        journal.start_run("raw.csv")
+        journal.record_completed([1, 2])
+        # Não descarregado: perdido na interrupção, será extraído de novo
+        journal.record_completed([3])
+
+        resumed = self.journal()
+        self.assertEqual(resumed.completed, {1, 2})
+        self.assertEqual(resumed.get("last_id"), 2)
+
+        resumed.start_run("raw.csv", resume=True)
+        self.assertEqual(resumed.completed, {1, 2})
+        resumed.start_run("outro.csv", resume=True)
+        self.assertEqual(resumed.completed, set())
+
+    def test_compaction_moves_journal_into_snapshot(self):
+        journal = self.journal(compact_records=2)
+        journal.start_run("raw.csv")
+        journal.record_completed([1, 2])
+        journal.record_completed([3, 4])
+
+        self.assertEqual(os.path.getsize(journal.journal_path), 0)
+        self.assertEqual(self.journal().completed, {1, 2, 3, 4})
+
+        journal.record_completed([5, 6])
+        self.assertEqual(self.journal().completed, {1, 2, 3, 4, 5, 6})
+
+    def test_incomplete_journal_line_is_ignored(self):
+        journal = self.journal()
+        journal.start_run("raw.csv")
+        journal.record_completed([1, 2])
+        with open(journal.journal_path, "a") as f:
+            f.write('{"completed": [3, 4')
+
+        with self.assertLogs(level="WARNING"):
+            resumed = self.journal()
+        self.assertEqual(resumed.completed, {1, 2})
+
+    def test_finish_run_keeps_watermark(self):
+        journal = self.journal()
+        journal.start_run("raw.csv")
+        journal.set("watermark", "2024-01-10T00:00:00.000000Z")
+        journal.record_completed([1])
+        journal.finish_run()
+
+        reloaded = self.journal()
+        self.assertEqual(reloaded.completed, set())
+        self.assertIsNone(reloaded.get("run"))
+        self.assertEqual(reloaded.get("watermark"), "2024-01-10T00:00:00.000000Z")
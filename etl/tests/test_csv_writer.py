@@ -0,0 +1,72 @@
+import os
+import csv
+import tempfile
+
+from django.test import SimpleTestCase
+
+from etl.utils.csv_writer import StreamingCsvWriter
+
+COLUMNS = ["id", "title"]
+
+
+class StreamingCsvWriterTests(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "raw.csv")
+
+    def read_rows(self):
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+    def interrupted_writer(self, rows, partial):
+        """
+        Simula uma extração interrompida: linhas descarregadas seguidas de um registro
+        pela metade, sem close() (o arquivo .offset continua no disco).
+        """
+        writer = StreamingCsvWriter(self.path, COLUMNS, flush_rows=1)
+        for row in rows:
+            writer.write_row(row)
+        writer._file.write(partial)
+        writer._file.flush()
+        writer._file.close()
+
+    def test_resume_truncates_at_saved_offset(self):
+        self.interrupted_writer([{"id": 1, "title": "Bug"}, {"id": 2, "title": "Task"}], '3,"Sem fim')
+        self.assertTrue(os.path.exists(self.path + ".offset"))
+
+        with self.assertLogs(level="WARNING"):
+            writer = StreamingCsvWriter(self.path, COLUMNS)
+        with writer:
+            self.assertTrue(writer.resumed)
+            self.assertEqual(writer.written_ids, {1, 2})
+            writer.write_row({"id": 3, "title": "Story"})
+
+        self.assertEqual([row["id"] for row in self.read_rows()], ["1", "2", "3"])
+        self.assertFalse(os.path.exists(self.path + ".offset"))
+
+    def test_resume_without_offset_keeps_quoted_line_breaks(self):
+        with StreamingCsvWriter(self.path, COLUMNS) as writer:
+            writer.write_row({"id": 1, "title": "linha 1\nlinha 2"})
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('2,"corte\n')
+
+        with self.assertLogs(level="WARNING"):
+            writer = StreamingCsvWriter(self.path, COLUMNS)
+        with writer:
+            self.assertEqual(writer.written_ids, {1})
+
+        self.assertEqual(self.read_rows(), [{"id": "1", "title": "linha 1\nlinha 2"}])
+
+    def test_different_header_restarts_file(self):
+        with StreamingCsvWriter(self.path, ["id"]) as writer:
+            writer.write_row({"id": 1})
+
+        with self.assertLogs(level="WARNING"):
+            writer = StreamingCsvWriter(self.path, COLUMNS)
+        with writer:
+            self.assertFalse(writer.resumed)
+            self.assertEqual(writer.written_ids, set())
+            writer.write_row({"id": 2, "title": "Bug"})
+
+        self.assertEqual(self.read_rows(), [{"id": "2", "title": "Bug"}])
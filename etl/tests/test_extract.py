@@ -0,0 +1,78 @@
+import os
+import csv
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from etl.scripts import extract
+from etl.utils.mock_azure_devops import changed_date, start_in_background
+
+SIZE = 60
+
+
+class WatermarkExtractionTests(SimpleTestCase):
+    """
+    Extração incremental contra o servidor mock (ver etl/utils/mock_azure_devops.py).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server, cls.url = start_in_background(size=SIZE)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        patcher = mock.patch.multiple(
+            extract, api_url=self.url, organization="org", project="proj", pat="pat",
+            CHECKPOINT_FILE=os.path.join(self.dir.name, "checkpoint.json"),
+            ITEM_CACHE=False, STREAMING=True, _journal=None, _client=None, _cache=None,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def extracted_ids(self, **kwargs):
+        output_path = os.path.join(self.dir.name, "raw.csv")
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        watermark = extract.run_extract(output_path, mode="batch", **kwargs)
+        with open(output_path, newline="", encoding="utf-8") as f:
+            return watermark, {int(row["id"]) for row in csv.DictReader(f)}
+
+    def test_extraction_returns_watermark_without_saving_it(self):
+        watermark, ids = self.extracted_ids(full_refresh=True)
+
+        latest = max(changed_date(i) for i in range(1, SIZE + 1))
+        self.assertEqual(ids, set(range(1, SIZE + 1)))
+        self.assertEqual(extract.parse_changed_date(watermark).replace(tzinfo=None), latest)
+        # Só a carga bem-sucedida grava o watermark (ver run_etl)
+        self.assertIsNone(extract.load_watermark())
+
+    def test_incremental_extraction_uses_saved_watermark(self):
+        watermark, _ = self.extracted_ids(full_refresh=True)
+        extract.save_watermark(watermark)
+
+        with mock.patch.object(extract, "WATERMARK_OVERLAP", timedelta(days=5)):
+            _, ids = self.extracted_ids()
+
+        since = extract.load_watermark().replace(tzinfo=None) - timedelta(days=5)
+        expected = {i for i in range(1, SIZE + 1) if changed_date(i) >= since}
+        self.assertEqual(ids, expected)
+        self.assertTrue(1 < len(ids) < SIZE)
+
+    def test_older_watermark_does_not_move_it_back(self):
+        watermark, _ = self.extracted_ids(full_refresh=True)
+        extract.save_watermark(watermark)
+        older = extract.parse_changed_date(watermark) - timedelta(days=1)
+
+        extract.save_watermark(older.strftime("%Y-%m-%dT%H:%M:%S.%fZ"))
+
+        self.assertEqual(extract.load_watermark(), extract.parse_changed_date(watermark))
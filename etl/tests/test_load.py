@@ -0,0 +1,59 @@
+import os
+import tempfile
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+
+from dashboard.models import WorkItem, WorkItemSummary
+from etl.scripts import load
+from etl.tests.test_load_copy import processed_frame
+
+
+class ChunkedLoadTests(TestCase):
+    def setUp(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        patcher = mock.patch.object(load, "LOAD_PROGRESS_FILE", os.path.join(work_dir.name, "load_progress.json"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Item já resolvido: regravá-lo marca o bucket (Bug, janeiro) para recálculo
+        WorkItem.objects.create(external_id=1, title="Bug no login", type="Bug", state="Resolved",
+                                created_date=date(2024, 1, 2), changed_date=date(2024, 1, 10),
+                                resolved_date=date(2024, 1, 10))
+        WorkItemSummary.objects.all().delete()
+
+        self.path = os.path.join(work_dir.name, "processed.csv")
+        processed_frame([
+            (1, "Bug no login (revisado)", "Resolved", "2024-01-02", "2024-01-11", "Ana", "Bug"),
+            (2, "Revisar deploy", "Active", "2024-01-04", "2024-01-05", None, "Task"),
+        ]).to_csv(self.path, index=False)
+
+    def interrupted_load(self):
+        load_frame = load.load_frame
+
+        def interrupt_second_chunk(df, **kwargs):
+            if df["id"].iloc[0] == 2:
+                raise KeyboardInterrupt
+            return load_frame(df, **kwargs)
+
+        with mock.patch.object(load, "load_frame", side_effect=interrupt_second_chunk), \
+                self.assertRaises(KeyboardInterrupt):
+            with load.bulk_ingest():
+                load.load_file_chunked(self.path, chunk_size=1)
+
+    def test_interrupted_load_refreshes_committed_buckets(self):
+        self.interrupted_load()
+
+        self.assertEqual(WorkItem.objects.get(external_id=1).title, "Bug no login (revisado)")
+        self.assertEqual(WorkItemSummary.objects.get(type="Bug", year=2024, month=1).total_count, 1)
+
+    def test_progress_keeps_buckets_for_resume(self):
+        self.interrupted_load()
+
+        self.assertEqual(load.load_progress(self.path), (0, {("Bug", date(2024, 1, 1))}))
+        with load.bulk_ingest():
+            self.assertEqual(load.load_file_chunked(self.path, chunk_size=1), 1)
+            self.assertIn(("Bug", date(2024, 1, 1)), load.dirty_buckets())
+        self.assertFalse(os.path.exists(load.LOAD_PROGRESS_FILE))
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+import pandas as pd
+from django.db import connection
+from django.test import TestCase
+
+from dashboard.models import WorkItem, WorkItemHistory
+from etl.scripts import load
+from etl.scripts.load import prepare_work_items, upsert_work_items
+from etl.scripts.load_copy import copy_work_items
+
+
+def processed_frame(rows):
+    """
+    DataFrame no formato do arquivo processado (saída de transform_frame).
+    """
+    return pd.DataFrame(rows, columns=["id", "System.Title", "System.State", "System.CreatedDate",
+                                       "System.ChangedDate", "System.AssignedTo", "System.WorkItemType"])
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "COPY só existe no PostgreSQL")
+class CopyWorkItemsTests(TestCase):
+    def setUp(self):
+        self.df = processed_frame([
+            (1, "Bug no login", "New", "2024-01-02", "2024-01-03", "Ana", "Bug"),
+            (2, "Revisar deploy", "Active", "2024-01-04", "2024-01-05", None, "Task"),
+        ])
+
+    def test_matches_orm_upsert(self):
+        columns, invalid = prepare_work_items(self.df)
+        self.assertFalse(invalid.any())
+
+        self.assertEqual(copy_work_items(columns), 2)
+        copied = list(WorkItem.objects.order_by("external_id").values(
+            "external_id", "title", "type", "state", "created_date", "changed_date", "assigned_to", "content_hash"))
+
+        WorkItemHistory.objects.all().delete()
+        WorkItem.objects.all().delete()
+        upsert_work_items(columns)
+        upserted = list(WorkItem.objects.order_by("external_id").values(
+            "external_id", "title", "type", "state", "created_date", "changed_date", "assigned_to", "content_hash"))
+
+        self.assertEqual(copied, upserted)
+
+    def test_only_changed_items_are_rewritten(self):
+        columns, _ = prepare_work_items(self.df)
+        copy_work_items(columns)
+
+        changed = self.df.copy()
+        changed.loc[0, ["System.State", "System.ChangedDate"]] = ["Resolved", "2024-01-10"]
+        columns, _ = prepare_work_items(changed)
+
+        self.assertEqual(copy_work_items(columns), 1)
+        item = WorkItem.objects.get(external_id=1)
+        self.assertEqual((item.state, item.changed_date), ("Resolved", date(2024, 1, 10)))
+        self.assertEqual(list(item.history.order_by("changed_date").values_list("state", flat=True)),
+                         ["New", "Resolved"])
+        self.assertEqual(WorkItemHistory.objects.filter(work_item__external_id=2).count(), 1)
+
+    def test_older_versions_are_skipped(self):
+        columns, _ = prepare_work_items(self.df)
+        copy_work_items(columns)
+
+        older = self.df.copy()
+        older.loc[:, ["System.State", "System.ChangedDate"]] = ["New", "2023-12-31"]
+        columns, _ = prepare_work_items(older)
+
+        self.assertEqual(copy_work_items(columns), 0)
+        self.assertEqual(upsert_work_items(columns), 0)
+        self.assertEqual(list(WorkItem.objects.order_by("external_id").values_list("state", flat=True)),
+                         ["New", "Active"])
+        self.assertEqual(WorkItemHistory.objects.count(), 2)
+
+
+class EmptyTitleTests(TestCase):
+    """
+    Título vazio no arquivo processado: rejeitado antes da gravação, no COPY e no ORM.
+    """
+
+    def test_empty_title_is_rejected_on_both_paths(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        path = os.path.join(work_dir.name, "processed.csv")
+        processed_frame([
+            (1, "Bug no login", "New", "2024-01-02", "2024-01-03", "Ana", "Bug"),
+            (2, "", "Active", "2024-01-04", "2024-01-05", None, "Task"),
+        ]).to_csv(path, index=False)
+
+        for use_copy in (True, False):
+            with self.subTest(use_copy=use_copy), mock.patch.object(load, "LOAD_COPY", use_copy):
+                WorkItem.objects.all().delete()
+                rejects = load.reject_path_for(path)
+                if os.path.exists(rejects):
+                    os.remove(rejects)
+
+                self.assertEqual(load.load_data_to_db(path, streaming=False), 1)
+                self.assertEqual(list(WorkItem.objects.values_list("external_id", flat=True)), [1])
+                self.assertEqual(pd.read_csv(rejects)["id"].tolist(), [2])
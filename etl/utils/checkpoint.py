@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import logging
+
+# Frequência de gravação do journal: a cada N itens concluídos ou T segundos
+FLUSH_ITEMS = int(os.getenv('ETL_CHECKPOINT_FLUSH_ITEMS', 1000))
+FLUSH_SECONDS = float(os.getenv('ETL_CHECKPOINT_FLUSH_SECONDS', 10))
+# Quantidade de registros no journal que dispara a compactação no snapshot
+COMPACT_RECORDS = int(os.getenv('ETL_CHECKPOINT_COMPACT_RECORDS', 500))
+
+
+class CheckpointJournal:
+    """
+    Checkpoint da extração em dois arquivos:
+
+    - snapshot (JSON): estado compactado, substituído de forma atômica (tmp + os.replace);
+    - journal (JSON Lines): registros acrescentados desde o último snapshot.
+
+    O estado guarda last_id, watermark, a execução corrente (`run`) e o conjunto de IDs
+    concluídos nela. Os IDs são acumulados em memória e gravados em lote, em vez de
+    reescrever o arquivo a cada Work Item.
+    """
+
+    def __init__(self, snapshot_path, flush_items=FLUSH_ITEMS, flush_seconds=FLUSH_SECONDS,
+                 compact_records=COMPACT_RECORDS):
+        self.snapshot_path = snapshot_path
+        self.journal_path = os.path.splitext(snapshot_path)[0] + ".journal"
+        self.flush_items = flush_items
+        self.flush_seconds = flush_seconds
+        self.compact_records = compact_records
+        # Chamado antes de cada gravação do journal (ex.: descarregar o CSV correspondente)
+        self.before_flush = None
+
+        self.state = {}
+        self.completed = set()
+        self._pending_ids = []
+        self._journal_records = 0
+        self._last_flush = time.monotonic()
+        os.makedirs(os.path.dirname(snapshot_path) or ".", exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r') as f:
+                    self.state = json.load(f)
+            except Exception as e:
+                logging.warning(f"Erro ao carregar checkpoint: {e}")
+        self.completed = set(self.state.pop("completed", []))
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Última linha incompleta de uma gravação interrompida
+                        logging.warning("Registro incompleto ignorado no journal de checkpoint.")
+                        continue
+                    self._apply(record)
+                    self._journal_records += 1
+
+    def _apply(self, record):
+        self.completed.update(record.pop("completed", []))
+        self.state.update(record)
+
+    def get(self, key, default=None):
+        return self.state.get(key, default)
+
+    def set(self, key, value):
+        """
+        Grava um valor de estado imediatamente (ex.: watermark).
+        """
+        self.state[key] = value
+        self.flush({key: value})
+
+    def record_completed(self, work_item_ids):
+        """
+        Registra IDs concluídos; a gravação acontece em lote (flush_items ou flush_seconds).
+        """
+        if not work_item_ids:
+            return
+        self._pending_ids.extend(work_item_ids)
+        self.completed.update(work_item_ids)
+        self.state["last_id"] = work_item_ids[-1]
+        if (len(self._pending_ids) >= self.flush_items
+                or time.monotonic() - self._last_flush >= self.flush_seconds):
+            self.flush()
+
+    def flush(self, extra=None):
+        record = dict(extra or {})
+        if self._pending_ids:
+            record["completed"] = self._pending_ids
+            record["last_id"] = self.state["last_id"]
+        self._last_flush = time.monotonic()
+        if not record:
+            return
+
+        if self.before_flush:
+            self.before_flush()
+        try:
+            with open(self.journal_path, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            logging.error(f"Erro ao salvar checkpoint: {e}")
+            return
+        self._pending_ids = []
+        self._journal_records += 1
+        if self._journal_records >= self.compact_records:
+            self.compact()
+
+    def compact(self):
+        """
+        Consolida snapshot + journal em um novo snapshot atômico e esvazia o journal.
+        """
+        snapshot = dict(self.state, completed=sorted(self.completed))
+        tmp_path = self.snapshot_path + ".tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            # Se o processo cair aqui, reaplicar o journal sobre o snapshot novo é idempotente
+            open(self.journal_path, 'w').close()
+            self._journal_records = 0
+        except Exception as e:
+            logging.error(f"Erro ao compactar checkpoint: {e}")
+
+    def start_run(self, run_id, resume=True):
+        """
+        Inicia (ou retoma) uma execução. Os IDs concluídos só são mantidos quando a
+        execução anterior interrompida é a mesma (`run_id`) e `resume` é verdadeiro.
+        """
+        if resume and self.state.get("run") == run_id and self.completed:
+            logging.info(f"Retomando execução {run_id}: {len(self.completed)} Work Items já concluídos.")
+        else:
+            self.completed = set()
+            self._pending_ids = []
+        self.state["run"] = run_id
+        self.compact()
+
+    def finish_run(self):
+        """
+        Encerra a execução: descarta os IDs concluídos e compacta o checkpoint.
+        """
+        self.flush()
+        self.completed = set()
+        self.state["run"] = None
+        self.compact()
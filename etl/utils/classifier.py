@@ -0,0 +1,58 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Valor de System.WorkItemType -> tipo do dashboard (WorkItem.WORK_ITEM_TYPES)
+WORK_ITEM_TYPE_MAP = {
+    "Bug": "Bug",
+    "Task": "Task",
+    "User Story": "UserStory",
+    "Product Backlog Item": "UserStory",
+    "Incident": "Incident",
+}
+
+# Regras pelo título, em ordem de prioridade: a primeira que casar define o tipo
+TITLE_RULES = [
+    ("Bug", r"Bug"),
+    ("Task", r"Task"),
+    ("UserStory", r"User Story"),
+    ("Incident", r"Incident"),
+]
+DEFAULT_TYPE = "Task"
+
+
+def compile_rules(rules):
+    """
+    Valida e compila as regras uma única vez, na importação do módulo.
+    """
+    return [(name, re.compile(pattern)) for name, pattern in rules]
+
+
+COMPILED_RULES = compile_rules(TITLE_RULES)
+
+
+def classify_titles(titles):
+    """
+    Classifica uma coluna de títulos de uma vez: uma busca vetorizada por regra
+    (str.contains) e np.select para aplicar a prioridade.
+    """
+    titles = pd.Series(titles, dtype="string")
+    conditions = [
+        titles.str.contains(pattern).fillna(False).to_numpy(dtype=bool)
+        for _, pattern in COMPILED_RULES
+    ]
+    types = np.select(conditions, [name for name, _ in COMPILED_RULES], default=DEFAULT_TYPE)
+    return pd.Series(types, index=titles.index, dtype=object)
+
+
+def classify_work_items(titles, work_item_types=None):
+    """
+    Define o tipo de cada Work Item. Usa System.WorkItemType quando presente e
+    conhecido; os demais são classificados pelo título.
+    """
+    types = classify_titles(titles)
+    if work_item_types is not None:
+        mapped = pd.Series(work_item_types, index=types.index, dtype="string").map(WORK_ITEM_TYPE_MAP)
+        types = mapped.astype(object).where(mapped.notna(), types)
+    return types
@@ -0,0 +1,135 @@
+import os
+import csv
+import time
+import logging
+
+# Frequência de descarga para o disco: a cada N linhas ou T segundos, o que vier primeiro
+FLUSH_ROWS = int(os.getenv('ETL_STREAM_FLUSH_ROWS', 1000))
+FLUSH_SECONDS = float(os.getenv('ETL_STREAM_FLUSH_SECONDS', 10))
+
+
+class StreamingCsvWriter:
+    """
+    Grava linhas em CSV à medida que chegam, sem manter o conjunto de dados em memória.
+
+    Se o arquivo já existir (execução anterior interrompida), as novas linhas são
+    acrescentadas ao final. Com `track_ids`, `written_ids` traz os IDs já gravados
+    (lidos do arquivo parcial), para que a extração retome de onde parou.
+
+    A cada descarga, o offset em bytes do fim da última linha completa é gravado em
+    `<arquivo>.offset`; ao retomar, o arquivo é truncado nesse offset. Um arquivo com
+    cabeçalho diferente de `fieldnames` (gravado por outra versão) é recomeçado do zero;
+    `resumed` indica se as linhas anteriores foram mantidas.
+    """
+
+    def __init__(self, output_path, fieldnames, id_field="id", track_ids=True,
+                 flush_rows=FLUSH_ROWS, flush_seconds=FLUSH_SECONDS):
+        self.output_path = output_path
+        self.fieldnames = fieldnames
+        self.id_field = id_field
+        self.track_ids = track_ids
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.offset_path = output_path + ".offset"
+        self.written_ids = set()
+        self.rows_written = 0
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            self._discard_partial_line()
+        resuming = os.path.exists(output_path) and os.path.getsize(output_path) > 0
+        if resuming and self._read_header() != list(fieldnames):
+            logging.warning(f"Cabeçalho de {output_path} difere das colunas atuais. Recomeçando o arquivo.")
+            resuming = False
+        self.resumed = resuming
+        if resuming and track_ids:
+            self.written_ids = self._read_written_ids()
+            logging.info(f"Retomando {output_path}: {len(self.written_ids)} Work Items já gravados.")
+        elif resuming:
+            logging.info(f"Retomando {output_path}: novas linhas serão acrescentadas.")
+
+        self._file = open(output_path, 'a' if resuming else 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames)
+        if not resuming:
+            self._writer.writeheader()
+
+    def _discard_partial_line(self):
+        # Uma interrupção no meio da escrita pode deixar o último registro incompleto
+        offset = self._read_offset()
+        with open(self.output_path, 'rb+') as f:
+            if offset is None:
+                offset = self._last_record_end(f)
+            end = f.seek(0, os.SEEK_END)
+            if offset >= end:
+                return
+            f.truncate(offset)
+            logging.warning(f"Registro incompleto descartado ao retomar {self.output_path}.")
+
+    def _read_offset(self):
+        try:
+            with open(self.offset_path, 'r') as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _last_record_end(f):
+        # Sem offset gravado (arquivo fechado normalmente): uma quebra de linha só encerra
+        # o registro fora de aspas, ou seja, com uma quantidade par de aspas antes dela
+        f.seek(0)
+        quotes = 0
+        position = 0
+        last_end = 0
+        for chunk in iter(lambda: f.read(65536), b""):
+            for line in chunk.splitlines(keepends=True):
+                quotes += line.count(b'"')
+                position += len(line)
+                if line.endswith(b"\n") and quotes % 2 == 0:
+                    last_end = position
+        return last_end
+
+    def _read_header(self):
+        with open(self.output_path, newline='', encoding='utf-8') as f:
+            return next(csv.reader(f), [])
+
+    def _read_written_ids(self):
+        with open(self.output_path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            return {int(row[self.id_field]) for row in reader if row.get(self.id_field)}
+
+    def write_row(self, row):
+        self._writer.writerow(row)
+        if self.track_ids:
+            self.written_ids.add(int(row[self.id_field]))
+        self.rows_written += 1
+        self._pending += 1
+        if self._pending >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        # write_row grava registros inteiros: após a descarga, tell() é o fim do último completo
+        self._save_offset(self._file.tell())
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def _save_offset(self, offset):
+        tmp_path = self.offset_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(str(offset))
+        os.replace(tmp_path, self.offset_path)
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+            # Fechado normalmente, o arquivo termina em um registro completo
+            os.remove(self.offset_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,14 +1,41 @@
-from datetime import datetime
 import logging
 
-def format_date_br(date_str):
-    try:
-        if "." in date_str:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S.%fZ")
-        else:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%SZ")
-        return date_obj.strftime("%d/%m/%Y")
-    except ValueError as e:
-        logging.error(f"Erro ao formatar a data {date_str}: {e}")
-        return None
+import pandas as pd
 
+# Formato das datas no arquivo processado (ISO, só a data)
+PROCESSED_DATE_FORMAT = "%Y-%m-%d"
+# Formato gravado pelas versões antigas do transform
+LEGACY_DATE_FORMAT = "%d/%m/%Y"
+
+
+def parse_api_dates(values):
+    """
+    Converte de uma vez uma coluna de timestamps da API (ex.: 2024-01-31T12:00:00.123Z)
+    em datas (datetime64, meia-noite UTC). Valores inválidos viram NaT.
+    """
+    parsed = pd.to_datetime(values, format="ISO8601", utc=True, errors="coerce")
+    invalid = parsed.isna() & pd.Series(values).notna().to_numpy()
+    if invalid.any():
+        logging.error(f"{int(invalid.sum())} datas inválidas ignoradas: {list(pd.Series(values)[invalid][:5])}")
+    return parsed.dt.tz_convert(None).dt.normalize()
+
+
+def parse_processed_dates(values):
+    """
+    Converte de uma vez uma coluna de datas do arquivo processado. Aceita o formato
+    ISO atual e, para arquivos antigos, o formato DD/MM/AAAA.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    parsed = pd.to_datetime(values, format=PROCESSED_DATE_FORMAT, errors="coerce")
+    legacy = parsed.isna() & pd.Series(values).notna().to_numpy()
+    if legacy.any():
+        parsed = parsed.where(~legacy, pd.to_datetime(values, format=LEGACY_DATE_FORMAT, errors="coerce"))
+    return parsed
+
+
+def to_python_dates(parsed):
+    """
+    Converte uma coluna datetime64 em objetos date (NaT vira None), para o ORM.
+    """
+    return parsed.dt.date.astype(object).where(parsed.notna(), None)
@@ -0,0 +1,196 @@
+import os
+import time
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from urllib3 import PoolManager
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Quantidade de hosts com pool mantido em cache e conexões keep-alive por host
+POOL_CONNECTIONS = int(os.getenv('ETL_HTTP_POOL_CONNECTIONS', 4))
+POOL_MAXSIZE = int(os.getenv('ETL_HTTP_POOL_MAXSIZE', 16))
+KEEPALIVE_TIMEOUT = 30
+
+DEFAULT_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+
+class PoolStats:
+    """
+    Contadores de uso do pool: conexões reaproveitadas (keep-alive) x conexões novas (TCP+TLS),
+    além da duração de cada requisição (usada pelo benchmark de extração).
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self, reused):
+        with self._lock:
+            if reused:
+                self.reused_connections += 1
+            else:
+                self.new_connections += 1
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+        }
+
+    def __str__(self):
+        return (f"{self.requests} requisições, {self.reused_connections} conexões reaproveitadas, "
+                f"{self.new_connections} conexões novas")
+
+
+class _CountingPoolMixin:
+    stats = None
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+        if self.stats is not None:
+            # Sem socket aberto a conexão fará um novo handshake TCP(+TLS)
+            self.stats.record_connection(reused=getattr(conn, "sock", None) is not None)
+        return conn
+
+
+class CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class CountingPoolManager(PoolManager):
+    def __init__(self, *args, stats=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+        self.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        pool.stats = self.stats
+        return pool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    def __init__(self, stats, **kwargs):
+        # init_poolmanager é chamado pelo construtor da classe base
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = CountingPoolManager(
+            num_pools=connections, maxsize=maxsize, block=block, stats=self.stats, **pool_kwargs
+        )
+
+
+class AzureDevOpsClient:
+    """
+    Sessão HTTP compartilhada para as chamadas ao Azure DevOps.
+
+    Mantém as conexões abertas entre requisições (keep-alive), limita o número de
+    conexões por host e aceita respostas gzip/deflate, que o requests descompacta.
+    """
+
+    def __init__(self, pat, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, timeout=30):
+        self.timeout = timeout
+        self.stats = PoolStats()
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth('', pat)
+        self.session.headers.update(DEFAULT_HEADERS)
+
+        adapter = PooledHTTPAdapter(
+            self.stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,  # Nunca ultrapassa pool_maxsize conexões por host
+            max_retries=0,  # Retentativas ficam a cargo do tenacity
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        self.stats.record_request()
+        started = time.perf_counter()
+        try:
+            return self.session.request(method, url, **kwargs)
+        finally:
+            self.stats.record_latency(time.perf_counter() - started)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def create_async_session(pat, stats=None, limit_per_host=POOL_MAXSIZE, timeout=30):
+    """
+    Cria uma aiohttp.ClientSession com a mesma política de pool do AzureDevOpsClient.
+    Quando `stats` é informado, as conexões novas e reaproveitadas são contabilizadas nele.
+    """
+    import aiohttp
+
+    trace_configs = []
+    if stats is not None:
+        async def on_request_start(session, context, params):
+            stats.record_request()
+            context.started = time.perf_counter()
+
+        async def on_request_end(session, context, params):
+            stats.record_latency(time.perf_counter() - context.started)
+
+        async def on_connection_create_end(session, context, params):
+            stats.record_connection(reused=False)
+
+        async def on_connection_reuseconn(session, context, params):
+            stats.record_connection(reused=True)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_configs.append(trace_config)
+
+    connector = aiohttp.TCPConnector(
+        limit_per_host=limit_per_host,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=DEFAULT_HEADERS,
+        auth=aiohttp.BasicAuth('', pat or ''),
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        auto_decompress=True,
+        trace_configs=trace_configs,
+    )
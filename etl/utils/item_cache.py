@@ -0,0 +1,80 @@
+import os
+import json
+import sqlite3
+import logging
+
+# Limite de parâmetros por consulta no SQLite
+SQLITE_MAX_PARAMS = 900
+COMMIT_EVERY = 1000
+
+
+class WorkItemCache:
+    """
+    Cache local (SQLite) da última revisão extraída de cada Work Item e de sua linha no CSV.
+
+    `signature` identifica o layout da linha (ex.: colunas do CSV); se mudar, o cache
+    é descartado para que nenhuma linha em formato antigo seja reaproveitada.
+    """
+
+    def __init__(self, path, signature):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._pending = 0
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS work_items (id INTEGER PRIMARY KEY, rev INTEGER, row TEXT)"
+        )
+
+        current = self._conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if current and current[0] != signature:
+            logging.info("Layout das linhas mudou. Descartando o cache de Work Items.")
+            self._conn.execute("DELETE FROM work_items")
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)", (signature,))
+        self._conn.commit()
+
+    def _chunks(self, work_item_ids):
+        for i in range(0, len(work_item_ids), SQLITE_MAX_PARAMS):
+            yield work_item_ids[i:i + SQLITE_MAX_PARAMS]
+
+    def revisions(self, work_item_ids):
+        """
+        Retorna {id: rev} dos IDs presentes no cache.
+        """
+        revs = {}
+        for chunk in self._chunks(list(work_item_ids)):
+            placeholders = ",".join("?" * len(chunk))
+            revs.update(self._conn.execute(
+                f"SELECT id, rev FROM work_items WHERE id IN ({placeholders})", chunk
+            ).fetchall())
+        return revs
+
+    def rows(self, work_item_ids):
+        """
+        Gera as linhas em cache dos IDs informados, lendo do disco em blocos.
+        """
+        for chunk in self._chunks(list(work_item_ids)):
+            placeholders = ",".join("?" * len(chunk))
+            for (row,) in self._conn.execute(
+                f"SELECT row FROM work_items WHERE id IN ({placeholders}) ORDER BY id", chunk
+            ):
+                yield json.loads(row)
+
+    def put(self, work_item_id, rev, row):
+        if rev is None:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO work_items (id, rev, row) VALUES (?, ?, ?)",
+            (work_item_id, rev, json.dumps(row)),
+        )
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self._conn.close()
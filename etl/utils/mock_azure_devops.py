@@ -0,0 +1,287 @@
+"""
+Servidor HTTP local que simula os endpoints de Work Items do Azure DevOps
+(WIQL, item único, workitemsbatch e reporting/workitemrevisions).
+
+Permite executar e medir a extração sem acesso a dev.azure.com, inclusive com
+latência, respostas 429 com Retry-After e falhas 5xx injetadas:
+
+    python etl/utils/mock_azure_devops.py --port 8085 --size 5000 --latency-ms 50 --throttle-every 500
+    AZURE_DEVOPS_URL=http://localhost:8085 AZURE_DEVOPS_ORG=org AZURE_DEVOPS_PROJECT=proj \\
+        python -c "from etl.scripts.extract import run_extract; run_extract('/tmp/raw.csv')"
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+STATES = ["New", "Active", "Resolved", "Closed"]
+TITLE_PREFIXES = ["Bug", "Task", "User Story"]
+BASE_DATE = datetime(2024, 1, 1)
+CHANGED_SINCE = re.compile(r"\[System\.ChangedDate\]\s*>=\s*'([^']+)'")
+ID_RANGE = re.compile(r"\[System\.Id\]\s*>=\s*(\d+)\s+AND\s+\[System\.Id\]\s*<\s*(\d+)")
+WIQL_MAX_RESULTS = 20000
+REVISIONS_PAGE_ITEMS = 50
+
+
+def build_work_item(work_item_id):
+    """
+    Gera um Work Item sintético e determinístico para o ID informado.
+    """
+    created = BASE_DATE + timedelta(hours=work_item_id * 7)
+    changed = changed_date(work_item_id)
+    return {
+        "id": work_item_id,
+        "rev": 1 + work_item_id % 5,
+        "fields": {
+            "System.Title": f"{TITLE_PREFIXES[work_item_id % len(TITLE_PREFIXES)]} {work_item_id}",
+            "System.State": STATES[work_item_id % len(STATES)],
+            "System.CreatedDate": created.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "System.ChangedDate": changed.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "System.AssignedTo": {"displayName": f"User {work_item_id % 10}"},
+            "System.WorkItemType": TITLE_PREFIXES[work_item_id % len(TITLE_PREFIXES)],
+        },
+    }
+
+
+def changed_date(work_item_id):
+    created = BASE_DATE + timedelta(hours=work_item_id * 7)
+    return created + timedelta(days=work_item_id % 30, minutes=work_item_id % 60)
+
+
+def build_revisions(work_item_id):
+    """
+    Gera as revisões sintéticas de um Work Item; a última coincide com build_work_item.
+    """
+    created = BASE_DATE + timedelta(hours=work_item_id * 7)
+    last_rev = 1 + work_item_id % 5
+    revisions = []
+    for rev in range(1, last_rev + 1):
+        changed = changed_date(work_item_id) if rev == last_rev else created + timedelta(hours=rev - 1)
+        revisions.append({
+            "id": work_item_id,
+            "rev": rev,
+            "fields": {
+                "System.Id": work_item_id,
+                "System.Rev": rev,
+                "System.State": STATES[(work_item_id - (last_rev - rev)) % len(STATES)],
+                "System.ChangedDate": changed.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            },
+        })
+    return revisions
+
+
+def select_fields(work_item, fields):
+    if not fields:
+        return work_item
+    return {
+        "id": work_item["id"],
+        "rev": work_item["rev"],
+        "fields": {k: v for k, v in work_item["fields"].items() if k in fields},
+    }
+
+
+def parse_wiql_since(query):
+    """
+    Extrai o filtro "[System.ChangedDate] >= '...'" da consulta WIQL, se houver.
+    """
+    match = CHANGED_SINCE.search(query or "")
+    if not match:
+        return None
+    return datetime.fromisoformat(match.group(1).replace("Z", ""))
+
+
+class MockAzureDevOpsHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantém a conexão aberta entre requisições (keep-alive), como o Azure DevOps
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em escritas separadas; sem TCP_NODELAY o keep-alive sofre com delayed ACK
+    disable_nagle_algorithm = True
+    WORK_ITEM_PATH = re.compile(r"/_apis/wit/workitems/(\d+)$")
+
+    def log_message(self, format, *args):
+        logging.debug("mock-azure-devops: " + format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _inject_faults(self):
+        """
+        Aplica latência e, conforme a configuração do servidor, responde 429 ou 5xx.
+        Retorna True quando a requisição já foi respondida com uma falha.
+        """
+        fault = self.server.next_fault()
+        if self.server.latency:
+            time.sleep(self.server.latency * (1 + self.server.jitter * (2 * random.random() - 1)))
+        if fault == 429:
+            body = json.dumps({"message": "TF400733: limite de requisições excedido."}).encode("utf-8")
+            self.send_response(429)
+            self.send_header("Retry-After", str(self.server.retry_after))
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return True
+        if fault == 503:
+            self._send_json(503, {"message": "Serviço temporariamente indisponível."})
+            return True
+        return False
+
+    def do_GET(self):
+        if self._inject_faults():
+            return
+        parsed = urlparse(self.path)
+        if parsed.path.endswith("/_apis/wit/reporting/workitemrevisions"):
+            return self._send_revisions(parse_qs(parsed.query))
+
+        match = self.WORK_ITEM_PATH.search(parsed.path)
+        if not match:
+            return self._send_json(404, {"message": f"Rota não suportada: {parsed.path}"})
+
+        work_item_id = int(match.group(1))
+        if not 1 <= work_item_id <= self.server.size:
+            return self._send_json(404, {"message": f"Work Item {work_item_id} não existe."})
+
+        fields = parse_qs(parsed.query).get("fields", [""])[0]
+        fields = [f for f in fields.split(",") if f]
+        self._send_json(200, select_fields(build_work_item(work_item_id), fields))
+
+    def _send_revisions(self, params):
+        # O continuation token do mock é o próximo Work Item a ser percorrido
+        start = int(params.get("continuationToken", ["1"])[0])
+        end = min(start + REVISIONS_PAGE_ITEMS, self.server.size + 1)
+        values = [revision for i in range(start, end) for revision in build_revisions(i)]
+        self._send_json(200, {
+            "values": values,
+            "continuationToken": str(end),
+            "isLastBatch": end > self.server.size,
+        })
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        payload = self._read_json()
+        if self._inject_faults():
+            return
+
+        if parsed.path.endswith("/_apis/wit/wiql"):
+            query = payload.get("query", "")
+            ids = range(1, self.server.size + 1)
+            id_range = ID_RANGE.search(query)
+            if id_range:
+                ids = range(max(1, int(id_range.group(1))), min(self.server.size + 1, int(id_range.group(2))))
+            since = parse_wiql_since(query)
+            if since is not None:
+                ids = [i for i in ids if changed_date(i) >= since]
+            if query.rstrip().endswith("DESC"):
+                ids = list(reversed(ids))
+
+            # Sem $top, o Azure DevOps rejeita consultas acima do limite; com $top, trunca
+            top = parse_qs(parsed.query).get("$top")
+            if top:
+                ids = list(ids)[:int(top[0])]
+            elif len(ids) > WIQL_MAX_RESULTS:
+                return self._send_json(400, {"message": "VS402337: a consulta excede o limite de 20000 itens."})
+            return self._send_json(200, {"workItems": [{"id": i} for i in ids]})
+
+        if parsed.path.endswith("/_apis/wit/workitemsbatch"):
+            ids = payload.get("ids", [])
+            if len(ids) > 200:
+                return self._send_json(400, {"message": "O lote excede o limite de 200 IDs."})
+            fields = payload.get("fields")
+            value = [
+                select_fields(build_work_item(i), fields) if 1 <= i <= self.server.size else None
+                for i in ids
+            ]
+            return self._send_json(200, {"count": len(value), "value": value})
+
+        self._send_json(404, {"message": f"Rota não suportada: {parsed.path}"})
+
+
+class MockAzureDevOpsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, size=1000, latency=0.0, jitter=0.0, throttle_every=0,
+                 retry_after=1, error_rate=0.0, seed=None):
+        super().__init__(address, MockAzureDevOpsHandler)
+        self.size = size
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next_fault(self):
+        """
+        Decide a falha da próxima requisição: 429 a cada `throttle_every` requisições
+        e 503 com probabilidade `error_rate` (sorteio reproduzível com `seed`).
+        """
+        with self._lock:
+            self.requests += 1
+            if self.throttle_every and self.requests % self.throttle_every == 0:
+                return 429
+            if self.error_rate and self._random.random() < self.error_rate:
+                return 503
+        return None
+
+
+def create_server(host="127.0.0.1", port=0, size=1000, **faults):
+    """
+    Cria o servidor mock com `size` Work Items sintéticos (IDs de 1 a size).
+    Com port=0 o sistema escolhe uma porta livre, disponível em server.server_address.
+    `faults` aceita latency (segundos), jitter (fração), throttle_every, retry_after,
+    error_rate e seed.
+    """
+    return MockAzureDevOpsServer((host, port), size=size, **faults)
+
+
+def start_in_background(size=1000, **faults):
+    """
+    Inicia o servidor mock em uma thread daemon e retorna (server, url_base).
+    """
+    server = create_server(size=size, **faults)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor mock da API de Work Items do Azure DevOps.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--size", type=int, default=1000, help="Quantidade de Work Items sintéticos.")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latência adicionada a cada resposta.")
+    parser.add_argument("--jitter", type=float, default=0, help="Variação da latência (fração, ex.: 0.2).")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Responde 429 a cada N requisições.")
+    parser.add_argument("--retry-after", type=int, default=1, help="Valor do cabeçalho Retry-After nos 429.")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fração de respostas 503.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    server = create_server(
+        args.host, args.port, args.size,
+        latency=args.latency_ms / 1000, jitter=args.jitter, throttle_every=args.throttle_every,
+        retry_after=args.retry_after, error_rate=args.error_rate, seed=args.seed,
+    )
+    logging.info(f"Servidor mock do Azure DevOps em http://{args.host}:{args.port} com {args.size} Work Items.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,158 @@
+import os
+import logging
+
+import pandas as pd
+
+from etl.utils.date_utils import PROCESSED_DATE_FORMAT as DATE_FORMAT, parse_processed_dates
+
+# Formato dos artefatos intermediários do ETL: parquet (colunar, tipado) ou csv
+INTERMEDIATE_FORMAT = os.getenv('ETL_INTERMEDIATE_FORMAT', 'parquet')
+PARQUET_COMPRESSION = os.getenv('ETL_PARQUET_COMPRESSION', 'zstd')
+
+EXTENSIONS = {"parquet": ".parquet", "csv": ".csv"}
+
+# Esquema do arquivo bruto (saída da extração)
+RAW_SCHEMA = {
+    "id": "int64",
+    "System.Title": "string",
+    "System.State": "string",
+    "System.CreatedDate": "string",
+    "System.ChangedDate": "string",
+    "System.AssignedTo": "string",
+    "System.WorkItemType": "string",
+}
+
+# Esquema do arquivo processado (saída do transform); datas sem hora
+PROCESSED_SCHEMA = {
+    "id": "int64",
+    "System.Title": "string",
+    "System.State": "string",
+    "System.CreatedDate": "date",
+    "System.ChangedDate": "date",
+    "System.AssignedTo": "string",
+    "System.WorkItemType": "string",
+}
+
+# Tipos usados na leitura de CSV (datas são convertidas depois)
+CSV_DTYPES = {"int64": "Int64", "string": "string", "date": "string"}
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def resolve_format(fmt=None):
+    """
+    Retorna o formato efetivo; sem pyarrow instalado, volta para CSV.
+    """
+    fmt = (fmt or INTERMEDIATE_FORMAT).lower()
+    if fmt not in EXTENSIONS:
+        logging.warning(f"Formato intermediário desconhecido '{fmt}'. Usando CSV.")
+        return "csv"
+    if fmt == "parquet" and not parquet_available():
+        logging.warning("pyarrow não instalado. Artefatos intermediários serão gravados em CSV.")
+        return "csv"
+    return fmt
+
+
+def artifact_path(directory, stem, fmt=None):
+    return os.path.join(directory, stem + EXTENSIONS[resolve_format(fmt)])
+
+
+def format_of(path):
+    return "parquet" if path.endswith(EXTENSIONS["parquet"]) else "csv"
+
+
+def _arrow_type(dtype):
+    import pyarrow as pa
+
+    return {"int64": pa.int64(), "string": pa.string(), "date": pa.date32()}[dtype]
+
+
+def write_frame(df, path, schema=None):
+    """
+    Grava o DataFrame no formato indicado pela extensão de `path`. Com `schema`,
+    as colunas conhecidas são gravadas com o tipo declarado.
+    """
+    if format_of(path) == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if schema:
+            table = table.cast(pa.schema([
+                pa.field(f.name, _arrow_type(schema[f.name])) if f.name in schema else f
+                for f in table.schema
+            ]))
+        pq.write_table(table, path, compression=PARQUET_COMPRESSION)
+    else:
+        df.to_csv(path, index=False, date_format=DATE_FORMAT)
+
+
+def read_frame(path, schema=None, **kwargs):
+    """
+    Lê um artefato CSV ou Parquet. Com `schema`, os tipos são aplicados na leitura
+    (sem inferência) e as colunas de data voltam como datetime64.
+    """
+    schema = schema or {}
+    date_columns = [name for name, dtype in schema.items() if dtype == "date"]
+    if format_of(path) == "parquet":
+        df = pd.read_parquet(path, **kwargs)
+    else:
+        dtype = {name: CSV_DTYPES[t] for name, t in schema.items()}
+        df = pd.read_csv(path, dtype=dtype or None, **kwargs)
+    return _convert_dates(df, date_columns, format_of(path))
+
+
+def _convert_dates(df, date_columns, fmt):
+    for name in date_columns:
+        if name in df.columns:
+            # No CSV aceita também o DD/MM/AAAA dos arquivos processados antigos
+            df[name] = parse_processed_dates(df[name]) if fmt == "csv" else pd.to_datetime(df[name])
+    return df
+
+
+def iter_frames(path, schema=None, chunksize=50000):
+    """
+    Lê um artefato CSV ou Parquet em blocos de até `chunksize` linhas, com os mesmos
+    tipos de read_frame, sem carregar o arquivo inteiro em memória.
+    """
+    schema = schema or {}
+    date_columns = [name for name, dtype in schema.items() if dtype == "date"]
+    if format_of(path) == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield _convert_dates(batch.to_pandas(), date_columns, "parquet")
+    else:
+        dtype = {name: CSV_DTYPES[t] for name, t in schema.items()}
+        for chunk in pd.read_csv(path, dtype=dtype or None, chunksize=chunksize):
+            yield _convert_dates(chunk, date_columns, "csv")
+
+
+def frame_from_records(records, schema):
+    """
+    Monta um DataFrame a partir de linhas (dicionários) com os tipos de `schema`, como
+    read_frame faria com o mesmo conteúdo gravado em CSV (texto vazio vira nulo).
+    """
+    df = pd.DataFrame.from_records(records, columns=list(schema))
+    df = df.astype({name: CSV_DTYPES[t] for name, t in schema.items() if name in df.columns})
+    text_columns = [name for name, t in schema.items() if t != "int64"]
+    df[text_columns] = df[text_columns].replace("", pd.NA)
+    return df
+
+
+def is_empty_artifact(path):
+    """
+    Verdadeiro se o arquivo não existe, está vazio ou não tem linhas de dados.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    if format_of(path) == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows == 0
+    return False